@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from toolmind.core.agents import planner as planner_module
+from toolmind.core.agents.planner import Planner
+
+
+def _step(step_id: str, title: str, inputs=None) -> dict:
+    return {
+        "thought": "",
+        "step_id": step_id,
+        "title": title,
+        "target": title,
+        "workflow": "",
+        "precautions": "",
+        "input_thought": "",
+        "input": inputs or [],
+    }
+
+
+class FakeConversationModel:
+    """按固定文本流式输出规划，记录是否请求了 JSON 修复"""
+
+    def __init__(self, content: str, fixed_content: str = ""):
+        self.content = content
+        self.fixed_content = fixed_content
+        self.fix_calls = 0
+
+    async def astream(self, input=None, config=None, **kwargs):
+        for start in range(0, len(self.content), 7):
+            yield AIMessageChunk(content=self.content[start : start + 7])
+
+    async def ainvoke(self, input=None, config=None, **kwargs):
+        self.fix_calls += 1
+        return AIMessage(content=self.fixed_content)
+
+
+class FakeToolManager:
+    async def obtain_tools(self):
+        return []
+
+    def get_tools_summary(self):
+        return []
+
+    def get_tools_prompt(self):
+        return ""
+
+
+class FakeEventChannel:
+    def __init__(self):
+        self.events = []
+
+    async def send(self, event: dict):
+        self.events.append(event)
+
+
+def _run_planner(monkeypatch, model: FakeConversationModel) -> dict:
+    async def get_conversation_model(user_id=None, **kwargs):
+        return model
+
+    monkeypatch.setattr(
+        planner_module.ModelManager, "get_conversation_model", get_conversation_model
+    )
+    planner = Planner("user", FakeToolManager(), FakeEventChannel())
+    return asyncio.run(planner({"query": "问题", "loop_count": 1}))
+
+
+def test_truncated_last_step_is_dropped(monkeypatch):
+    plan = json.dumps(
+        {"steps": [_step("s1", "检索资料"), _step("s2", "整理结论", ["s1"])]},
+        ensure_ascii=False,
+    )
+    # 截断在第三个步骤中间：本地修复会闭合该对象，但它缺少必填字段
+    truncated = plan[:-2] + ', {"thought": "", "step_id": "s3", "title": "补充'
+    model = FakeConversationModel(truncated)
+
+    result = _run_planner(monkeypatch, model)
+
+    assert [step.step_id for step in result["steps"]] == ["s1", "s2"]
+    assert model.fix_calls == 0
+
+
+def test_invalid_plan_falls_back_to_fix_prompt(monkeypatch):
+    fixed = json.dumps({"steps": [_step("s1", "检索资料")]}, ensure_ascii=False)
+    model = FakeConversationModel('{"steps": [{"step_id": "s1"', fixed)
+
+    result = _run_planner(monkeypatch, model)
+
+    assert [step.step_id for step in result["steps"]] == ["s1"]
+    assert model.fix_calls == 1
+
+
+def test_plan_without_steps_list_falls_back_to_fix_prompt(monkeypatch):
+    fixed = json.dumps({"steps": [_step("s1", "检索资料")]}, ensure_ascii=False)
+    model = FakeConversationModel('{"steps": "none"}', fixed)
+
+    result = _run_planner(monkeypatch, model)
+
+    assert [step.step_id for step in result["steps"]] == ["s1"]
+    assert model.fix_calls == 1
@@ -0,0 +1,55 @@
+import asyncio
+
+from toolmind.api.services import session_persistence
+from toolmind.api.services.session_persistence import SessionWriter
+from toolmind.database.models import SessionCreate
+
+
+class FakeSessionService:
+    """记录写入操作；指定的会话创建总是失败"""
+
+    def __init__(self, failing_session_id: str):
+        self.failing_session_id = failing_session_id
+        self.writes = []
+
+    async def create_session(self, session_create: SessionCreate):
+        await asyncio.sleep(0.01)
+        if session_create.session_id == self.failing_session_id:
+            raise RuntimeError("database unavailable")
+        self.writes.append(("create", session_create.session_id))
+
+    async def append_session_turn(self, session_id: str, session_context: dict):
+        self.writes.append(("turn", session_id))
+
+    async def update_session(self, session_id: str, user_id: str, **fields):
+        self.writes.append(("update", session_id))
+
+
+def test_ops_after_discarded_create_are_skipped(monkeypatch):
+    service = FakeSessionService("lost")
+    monkeypatch.setattr(session_persistence, "SessionService", service)
+
+    async def run():
+        writer = SessionWriter(workers=2, max_retries=1)
+        writer.start()
+        for session_id in ("lost", "kept"):
+            await writer.create_session(
+                SessionCreate(session_id=session_id, title="新对话", user_id="user")
+            )
+        # 创建仍在写入时登记的轮次与更新
+        await asyncio.sleep(0)
+        for session_id in ("lost", "kept"):
+            await writer.append_turn(session_id, {"query": "问题"})
+            await writer.update_session(session_id, "user", title="标题")
+        await writer.flush()
+        # 创建被丢弃之后登记的操作同样不写入
+        await writer.append_turn("lost", {"query": "追问"})
+        await writer.stop()
+
+    asyncio.run(run())
+
+    assert service.writes == [
+        ("create", "kept"),
+        ("turn", "kept"),
+        ("update", "kept"),
+    ]
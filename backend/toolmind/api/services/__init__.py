@@ -1,6 +1,7 @@
 from toolmind.api.services.llm import LLMService
 from toolmind.api.services.mcp_server import MCPService
 from toolmind.api.services.session import SessionService
+from toolmind.api.services.session_persistence import SessionWriter, session_writer
 from toolmind.api.services.usage_stats import UsageStatsService
 from toolmind.api.services.user import (
     UserPayload,
@@ -9,12 +10,14 @@ from toolmind.api.services.user import (
     get_user_jwt,
 )
 from toolmind.api.services.user_management import UserManagementService
-from toolmind.api.services.web_search import web_search
+from toolmind.api.services.web_search import web_search, web_search_client
 
 __all__ = [
     "LLMService",
     "MCPService",
     "SessionService",
+    "SessionWriter",
+    "session_writer",
     "UsageStatsService",
     "UserPayload",
     "UserService",
@@ -22,4 +25,5 @@ __all__ = [
     "get_user_jwt",
     "UserManagementService",
     "web_search",
+    "web_search_client",
 ]
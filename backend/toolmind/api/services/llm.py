@@ -7,8 +7,15 @@ from toolmind.database.models import AdminRole
 class LLMService:
 
     @classmethod
-    def _is_admin(cls, user_id: str) -> bool:
-        roles = UserRoleDao.get_user_roles(user_id)
+    def _invalidate_model_cache(cls, llm_id: str):
+        """配置变更后清除进程内的模型客户端缓存"""
+        from toolmind.core.agents.model import ModelManager
+
+        ModelManager.invalidate_llm(llm_id)
+
+    @classmethod
+    async def _is_admin(cls, user_id: str) -> bool:
+        roles = await UserRoleDao.get_user_roles(user_id)
         return any(one.role_id == AdminRole for one in roles)
 
     @classmethod
@@ -30,12 +37,13 @@ class LLMService:
     async def delete_llm(cls, llm_id: str):
         try:
             await LLMDao.delete_llm(llm_id=llm_id)
+            cls._invalidate_model_cache(llm_id)
         except Exception as err:
             raise ValueError(f"Delete LLM Appear Err: {err}")
 
     @classmethod
     async def verify_user_permission(cls, llm_id, user_id):
-        if cls._is_admin(user_id) or user_id == await cls.get_user_id_by_llm(llm_id):
+        if await cls._is_admin(user_id) or user_id == await cls.get_user_id_by_llm(llm_id):
             pass
         else:
             raise ValueError(f"没有权限访问")
@@ -60,6 +68,7 @@ class LLMService:
                 api_key=api_key,
                 provider=provider,
             )
+            cls._invalidate_model_cache(llm_id)
         except Exception as err:
             raise ValueError(f"Update LLM Appear Err: {err}")
 
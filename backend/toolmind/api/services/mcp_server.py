@@ -3,6 +3,13 @@ from toolmind.database.dao import MCPServerDao
 
 class MCPService:
 
+    @classmethod
+    def _invalidate_tool_catalog(cls, mcp_server_id):
+        """配置变更后清除进程级工具目录缓存"""
+        from toolmind.core.mcp import mcp_tool_catalog
+
+        mcp_tool_catalog.invalidate(mcp_server_id)
+
     @classmethod
     async def create_mcp_server(
         cls,
@@ -50,7 +57,7 @@ class MCPService:
         is_active: bool = None,
     ):
         try:
-            return await MCPServerDao.update_mcp_server(
+            result = await MCPServerDao.update_mcp_server(
                 mcp_server_id,
                 server_name,
                 url,
@@ -60,6 +67,8 @@ class MCPService:
                 params,
                 is_active,
             )
+            cls._invalidate_tool_catalog(mcp_server_id)
+            return result
         except Exception as err:
             raise ValueError(f"Update MCP Server Error: {err}")
 
@@ -74,7 +83,9 @@ class MCPService:
     @classmethod
     async def delete_server_from_id(cls, mcp_server_id):
         try:
-            return await MCPServerDao.delete_mcp_server(mcp_server_id)
+            result = await MCPServerDao.delete_mcp_server(mcp_server_id)
+            cls._invalidate_tool_catalog(mcp_server_id)
+            return result
         except Exception as err:
             raise ValueError(f"Delete Server From ID Error: {err}")
 
@@ -96,6 +107,13 @@ class MCPService:
         except Exception as err:
             raise ValueError(f"Get All Servers Error: {err}")
 
+    @classmethod
+    async def get_active_server_configs(cls, user_id):
+        try:
+            return await MCPServerDao.get_active_mcp_server_configs(user_id)
+        except Exception as err:
+            raise ValueError(f"Get Active Server Configs Error: {err}")
+
     @classmethod
     async def get_mcp_tools_info(cls, server_id):
         try:
@@ -1,6 +1,30 @@
-from toolmind.database.dao import Session, SessionDao
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Optional
+
+import orjson
+from toolmind.database.dao import Session, SessionDao, SessionTurnDao
 from toolmind.database.models import SessionCreate
 
+# 分页读取会话轮次时每页的默认轮数
+DEFAULT_TURN_PAGE_SIZE = 20
+# 会话列表每页的默认条数
+DEFAULT_SESSION_PAGE_SIZE = 50
+
+
+def _encode_cursor(is_pinned: bool, update_time: datetime, session_id: str) -> str:
+    payload = orjson.dumps([is_pinned, update_time.isoformat(), session_id])
+    return urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str):
+    """解析会话列表游标，格式不正确时抛出 ValueError"""
+    try:
+        is_pinned, update_time, session_id = orjson.loads(urlsafe_b64decode(cursor))
+        return bool(is_pinned), datetime.fromisoformat(update_time), str(session_id)
+    except Exception as err:
+        raise ValueError(f"Invalid cursor: {cursor}") from err
+
 
 class SessionService:
     @classmethod
@@ -9,18 +33,44 @@ class SessionService:
         return await SessionDao.create_session(session)
 
     @classmethod
-    async def get_sessions(cls, user_id):
-        results = await SessionDao.get_sessions(user_id)
-        results.sort(key=lambda x: x.update_time, reverse=True)
-        return [result.to_dict() for result in results]
+    async def get_sessions(
+        cls,
+        user_id,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_SESSION_PAGE_SIZE,
+    ):
+        """分页返回会话列表（不含对话内容），next_cursor 为空表示没有更多"""
+        after = _decode_cursor(cursor) if cursor else None
+        # 多取一条用于判断是否还有下一页
+        rows = await SessionDao.get_session_page(user_id, limit + 1, after)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [
+            {
+                "session_id": row.session_id,
+                "title": row.title,
+                "is_pinned": row.is_pinned,
+                "create_time": row.create_time.isoformat(),
+                "update_time": row.update_time.isoformat(),
+            }
+            for row in rows
+        ]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = _encode_cursor(
+                last.is_pinned, last.update_time, last.session_id
+            )
+        return {"items": items, "next_cursor": next_cursor}
 
     @classmethod
     async def delete_session(cls, session_ids, user_id):
         await SessionDao.delete_session(session_ids, user_id)
 
     @classmethod
-    async def update_session_contexts(cls, session_id, session_context):
-        return await SessionDao.update_session_contexts(session_id, session_context)
+    async def append_session_turn(cls, session_id, session_context):
+        """追加一轮对话，写入量与会话历史长度无关"""
+        return await SessionTurnDao.append_turn(session_id, session_context)
 
     @classmethod
     async def update_session(cls, session_id, user_id, title=None, is_pinned=None):
@@ -31,11 +81,48 @@ class SessionService:
         return await SessionDao.clear_session_contexts(session_id)
 
     @classmethod
-    async def get_session_from_id(cls, session_id, user_id):
+    async def get_session_from_id(
+        cls, session_id, user_id, turn_limit: Optional[int] = None
+    ):
+        """返回会话信息，contexts 为最近 turn_limit 轮对话（为空时返回全部）"""
         result = await SessionDao.get_session_from_id(session_id)
         if result is None:
             return None
-        return result.to_dict()
+        session = result.to_dict()
+        page = await cls._get_turn_page(session_id, None, turn_limit)
+        session["contexts"] = page["items"]
+        session["next_before_seq"] = page["next_before_seq"]
+        return session
+
+    @classmethod
+    async def get_session_turns(
+        cls,
+        session_id,
+        user_id,
+        before_seq: Optional[int] = None,
+        limit: int = DEFAULT_TURN_PAGE_SIZE,
+    ):
+        """向前分页读取会话轮次，next_before_seq 为空表示已到最早一轮"""
+        result = await SessionDao.get_session_from_id(session_id)
+        if result is None or result.user_id != user_id:
+            return None
+        return await cls._get_turn_page(session_id, before_seq, limit)
+
+    @classmethod
+    async def _get_turn_page(
+        cls, session_id, before_seq: Optional[int], limit: Optional[int]
+    ):
+        # 多取一轮用于判断是否还有更早的轮次
+        turns = await SessionTurnDao.get_turns(
+            session_id, before_seq, limit + 1 if limit else None
+        )
+        has_more = bool(limit) and len(turns) > limit
+        if has_more:
+            turns = turns[1:]
+        return {
+            "items": [turn.to_dict() for turn in turns],
+            "next_before_seq": turns[0].seq if has_more else None,
+        }
 
     @classmethod
     async def generate_session_title(cls, user_query):
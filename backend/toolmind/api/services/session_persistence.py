@@ -0,0 +1,202 @@
+"""
+会话持久化：后台按会话顺序写入会话的创建、轮次追加与更新，不阻塞 SSE 推送
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from uuid import uuid4
+
+from loguru import logger
+from toolmind.api.services.session import SessionService
+from toolmind.database.models import SessionCreate
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+# 记录创建失败的会话数上限，这些会话后续的写操作直接丢弃
+MAX_DISCARDED_SESSIONS = 1024
+
+CREATE = "create"
+APPEND_TURN = "append_turn"
+UPDATE = "update"
+
+
+@dataclass
+class _SessionOp:
+    kind: str
+    session_create: Optional[SessionCreate] = None
+    session_context: Optional[dict] = None
+    fields: Dict[str, object] = field(default_factory=dict)
+
+
+class SessionWriter:
+    """
+    会话的后台写入器（write-behind）。
+
+    Agent 运行只把创建会话、追加轮次、更新标题等写操作登记到按会话划分的待写列表，
+    立即返回，数据库变慢不会拖慢 SSE 推送；后台任务按会话依次提交，同一会话的操作保持顺序，
+    相邻的更新合并为一次写入，失败时退避重试。应用退出时 stop() 会写完所有待写操作。
+    """
+
+    def __init__(
+        self, workers: int = DEFAULT_WORKERS, max_retries: int = DEFAULT_MAX_RETRIES
+    ):
+        self.workers = workers
+        self.max_retries = max_retries
+
+        self._pending: Dict[str, List[_SessionOp]] = {}
+        self._inflight: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._idle: Optional[asyncio.Event] = None
+        # 创建操作重试耗尽被丢弃的会话，后续轮次与更新不能再写入，否则会产生孤立的轮次
+        self._discarded: "OrderedDict[str, None]" = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        """在应用事件循环中启动后台写入任务"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def create_session(self, session_create: SessionCreate) -> SessionCreate:
+        """登记新会话；session_id 在应用内生成，调用方无需等待数据库"""
+        if not session_create.session_id:
+            session_create.session_id = uuid4().hex
+        await self._submit(
+            session_create.session_id,
+            _SessionOp(CREATE, session_create=session_create),
+        )
+        return session_create
+
+    async def append_turn(self, session_id: str, session_context: dict) -> None:
+        await self._submit(
+            session_id, _SessionOp(APPEND_TURN, session_context=session_context)
+        )
+
+    async def update_session(
+        self, session_id: str, user_id: str, title=None, is_pinned=None
+    ) -> None:
+        fields = {"user_id": user_id, "title": title, "is_pinned": is_pinned}
+        await self._submit(session_id, _SessionOp(UPDATE, fields=fields))
+
+    async def _submit(self, session_id: str, op: _SessionOp) -> None:
+        if session_id in self._discarded:
+            logger.warning(f"Skip session {session_id} {op.kind}: session not created")
+            return
+        if not self.running:
+            # 未启动（如脚本环境）时退化为直接写入
+            await self._apply(op, session_id)
+            return
+
+        ops = self._pending.setdefault(session_id, [])
+        if not self._coalesce(ops, op):
+            ops.append(op)
+        self._idle.clear()
+        # 正在写入的会话由当前 worker 写完后重新入队，保证同一会话的操作不会并发执行
+        if len(ops) == 1 and session_id not in self._inflight:
+            self._queue.put_nowait(session_id)
+
+    @staticmethod
+    def _coalesce(ops: List[_SessionOp], op: _SessionOp) -> bool:
+        """将更新合并进尚未写入的上一个创建/更新操作，返回是否已合并"""
+        if op.kind != UPDATE or not ops:
+            return False
+        last = ops[-1]
+        changes = {
+            key: value
+            for key, value in op.fields.items()
+            if key != "user_id" and value is not None
+        }
+        if last.kind == CREATE:
+            for key, value in changes.items():
+                setattr(last.session_create, key, value)
+            return True
+        if last.kind == UPDATE:
+            last.fields.update(changes)
+            return True
+        return False
+
+    async def _run(self) -> None:
+        while True:
+            session_id = await self._queue.get()
+            ops = self._pending.pop(session_id, [])
+            self._inflight.add(session_id)
+            try:
+                for op in ops:
+                    if session_id in self._discarded:
+                        logger.warning(
+                            f"Skip session {session_id} {op.kind}: session not created"
+                        )
+                        continue
+                    if not await self._apply_with_retry(op, session_id):
+                        if op.kind == CREATE:
+                            self._discard_session(session_id)
+            finally:
+                self._inflight.discard(session_id)
+                if session_id in self._pending:
+                    self._queue.put_nowait(session_id)
+                elif not self._pending and not self._inflight:
+                    self._idle.set()
+
+    def _discard_session(self, session_id: str) -> None:
+        """会话创建失败后丢弃其尚未写入的操作，并拒绝之后登记的操作"""
+        self._discarded[session_id] = None
+        while len(self._discarded) > MAX_DISCARDED_SESSIONS:
+            self._discarded.popitem(last=False)
+        dropped = self._pending.pop(session_id, [])
+        if dropped:
+            logger.warning(
+                f"Drop {len(dropped)} pending ops of session {session_id}: "
+                f"session not created"
+            )
+
+    async def _apply_with_retry(self, op: _SessionOp, session_id: str) -> bool:
+        """写入单个操作，重试耗尽后丢弃并返回 False"""
+        for attempt in range(self.max_retries):
+            try:
+                await self._apply(op, session_id)
+                return True
+            except Exception as err:
+                logger.warning(
+                    f"Write session {session_id} {op.kind} failed "
+                    f"({attempt + 1}/{self.max_retries}): {err}"
+                )
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(0.5 * 2**attempt)
+        logger.error(f"Discard session {session_id} {op.kind} after retries")
+        return False
+
+    @staticmethod
+    async def _apply(op: _SessionOp, session_id: str) -> None:
+        if op.kind == CREATE:
+            await SessionService.create_session(op.session_create)
+        elif op.kind == APPEND_TURN:
+            await SessionService.append_session_turn(session_id, op.session_context)
+        else:
+            await SessionService.update_session(session_id, **op.fields)
+
+    async def flush(self) -> None:
+        """等待所有已登记的操作写入完成"""
+        if self.running:
+            await self._idle.wait()
+
+    async def stop(self) -> None:
+        """写完所有待写操作后停止后台任务（应用退出时调用）"""
+        if not self.running:
+            return
+        await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+session_writer = SessionWriter()
@@ -1,6 +1,4 @@
-from collections import defaultdict
-from datetime import datetime
-from typing import DefaultDict, Dict, List, Optional
+from typing import Dict, List, Optional
 
 from toolmind.database.dao import UsageStats, UsageStatsDao
 
@@ -8,27 +6,37 @@ from toolmind.database.dao import UsageStats, UsageStatsDao
 class UsageStatsService:
 
     @classmethod
-    async def create_usage_stats(cls, model, user_id, input_tokens=0, output_tokens=0):
+    async def create_usage_stats(
+        cls, model, user_id, input_tokens=0, output_tokens=0, cached_tokens=0
+    ):
         usage_stats = UsageStats(
             model=model,
             user_id=user_id,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
+            cached_tokens=cached_tokens,
         )
 
         await UsageStatsDao.create_usage_stats(usage_stats)
 
     @classmethod
-    def sync_create_usage_stats(cls, model, user_id, input_tokens=0, output_tokens=0):
+    def sync_create_usage_stats(
+        cls, model, user_id, input_tokens=0, output_tokens=0, cached_tokens=0
+    ):
         usage_stats = UsageStats(
             model=model,
             user_id=user_id,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
+            cached_tokens=cached_tokens,
         )
 
         UsageStatsDao.sync_create_usage_stats(usage_stats)
 
+    @classmethod
+    async def batch_create_usage_stats(cls, records: List[dict]):
+        await UsageStatsDao.batch_create_usage_stats(records)
+
     @classmethod
     async def get_usage_models(cls, user_id) -> List[str]:
         models = await UsageStatsDao.get_usage_models(user_id)
@@ -41,48 +49,22 @@ class UsageStatsService:
         model: Optional[str] = None,
         delta_days: int = 10000,  # 默认值可视为所有数据
     ):
-        results = await UsageStatsDao.get_agent_model_time_usage(
-            user_id, model, delta_days
-        )
-        # 按日期升序排序
-        results.sort(
-            key=lambda x: x.create_time.date() if x.create_time else datetime.min.date()
-        )
-
-        # 初始化嵌套字典（默认结构：日期→{"agent": {}, "model": {}}）
-        date_usage_dict: DefaultDict[str, Dict[str, Dict]] = defaultdict(
-            lambda: {"model": defaultdict(dict)}
-        )
+        # 日聚合表已按日期升序返回，每个 (日期, 模型) 只有一行
+        results = await UsageStatsDao.get_daily_usage(user_id, model, delta_days)
 
-        # 遍历数据，填充字典
+        # 结构：日期 → {"model": {模型: token 统计}}
+        date_usage_dict: Dict[str, Dict[str, Dict]] = {}
         for item in results:
-            # 提取日期字符串（仅保留年-月-日，作为第一层key）
-            date_key = (
-                item.create_time.date().isoformat() if item.create_time else "未知日期"
-            )
-
-            # 处理model相关统计
+            date_key = item.usage_date.isoformat()
             model_key = item.model or "未指定model"
-            # 初始化model的token数据
-            if not date_usage_dict[date_key]["model"][model_key]:
-                date_usage_dict[date_key]["model"][model_key] = {
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "total_tokens": 0,
-                }
-            # 累加model的token数量
-            date_usage_dict[date_key]["model"][model_key][
-                "input_tokens"
-            ] += item.input_tokens
-            date_usage_dict[date_key]["model"][model_key][
-                "output_tokens"
-            ] += item.output_tokens
-            date_usage_dict[date_key]["model"][model_key]["total_tokens"] += (
-                item.input_tokens + item.output_tokens
-            )
+            date_usage_dict.setdefault(date_key, {"model": {}})["model"][model_key] = {
+                "input_tokens": item.input_tokens,
+                "output_tokens": item.output_tokens,
+                "total_tokens": item.total_tokens,
+                "cached_tokens": item.cached_tokens,
+            }
 
-        final_dict = dict(date_usage_dict)
-        return final_dict
+        return date_usage_dict
 
     @classmethod
     async def get_usage_count_by_agent_model(
@@ -91,29 +73,15 @@ class UsageStatsService:
         model: Optional[str] = None,
         delta_days: int = 10000,  # 默认值可视为所有数据
     ):
-        results = await UsageStatsDao.get_agent_model_time_usage(
-            user_id, model, delta_days
-        )
-        # 按日期升序排序
-        results.sort(
-            key=lambda x: x.create_time.date() if x.create_time else datetime.min.date()
-        )
+        results = await UsageStatsDao.get_daily_usage(user_id, model, delta_days)
 
-        # 初始化嵌套字典（默认结构：日期→{"agent": {}, "model": {}}）
-        date_usage_dict: DefaultDict[str, Dict[str, Dict]] = defaultdict(
-            lambda: {"model": defaultdict(int)}
-        )
-
-        # 遍历数据，填充字典
+        # 结构：日期 → {"model": {模型: 调用次数}}
+        date_usage_dict: Dict[str, Dict[str, Dict]] = {}
         for item in results:
-            # 提取日期字符串（仅保留年-月-日，作为第一层key）
-            date_key = (
-                item.create_time.date().isoformat() if item.create_time else "未知日期"
-            )
-
-            # 处理model相关统计 - 统计调用次数
+            date_key = item.usage_date.isoformat()
             model_key = item.model or "未指定model"
-            date_usage_dict[date_key]["model"][model_key] += 1
+            date_usage_dict.setdefault(date_key, {"model": {}})["model"][
+                model_key
+            ] = item.call_count
 
-        final_dict = dict(date_usage_dict)
-        return final_dict
+        return date_usage_dict
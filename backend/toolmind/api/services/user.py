@@ -18,11 +18,16 @@ class UserPayload:
     def __init__(self, **kwargs):
         self.user_id = kwargs.get("user_id")
         self.user_role = kwargs.get("role")
-        if self.user_role != "admin":  # 非管理员用户，需要获取他的角色列表
-            roles = UserRoleDao.get_user_roles(self.user_id)
-            self.user_role = [one.role_id for one in roles]
         self.user_name = kwargs.get("user_name")
 
+    @classmethod
+    async def init_login_user(cls, **kwargs) -> "UserPayload":
+        user = cls(**kwargs)
+        if user.user_role != "admin":  # 非管理员用户，需要获取他的角色列表
+            roles = await UserRoleDao.get_user_roles(user.user_id)
+            user.user_role = [one.role_id for one in roles]
+        return user
+
     def is_admin(self):
         if self.user_role == "admin":
             return True
@@ -61,13 +66,13 @@ class UserService:
         return cls.encrypt_sha256_password(password) == encrypted_password
 
     @classmethod
-    def create_user(
+    async def create_user(
         cls, request: Request, login_user: UserPayload, req_data: CreateUserReq
     ):
         """
         创建用户
         """
-        exists_user = UserDao.get_user_by_username(req_data.user_name)
+        exists_user = await UserDao.get_user_by_username(req_data.user_name)
         if exists_user:
             # 抛出异常
             raise UserNameAlreadyExistError.http_exception()
@@ -75,19 +80,19 @@ class UserService:
             user_name=req_data.user_name,
             user_password=cls.decrypt_md5_password(req_data.password),
         )
-        user = UserDao.add_user_and_default_role(
+        user = await UserDao.add_user_and_default_role(
             user_name=user.user_name, user_password=user.user_password
         )
         return user
 
     @classmethod
-    def get_user_info_by_id(cls, user_id):
-        user_info = UserDao.get_user(user_id)
+    async def get_user_info_by_id(cls, user_id):
+        user_info = await UserDao.get_user(user_id)
         return user_info.to_dict()
 
     @classmethod
-    def get_user_id_by_name(cls, user_name):
-        user = UserDao.get_user_by_username(user_name)
+    async def get_user_id_by_name(cls, user_name):
+        user = await UserDao.get_user_by_username(user_name)
         return user.user_id
 
 
@@ -98,16 +103,16 @@ async def get_login_user(authorize: AuthJWT = Depends()) -> UserPayload:
     try:
         authorize.jwt_required()
         current_user = json.loads(authorize.get_jwt_subject())
-        return UserPayload(**current_user)
+        return await UserPayload.init_login_user(**current_user)
     except Exception as e:
         raise HTTPException(
             status_code=401, detail="Invalid authentication credentials"
         )
 
 
-def get_user_role(db_user: UserTable):
+async def get_user_role(db_user: UserTable):
     # 查询用户的角色列表
-    db_user_role = UserRoleDao.get_user_roles(db_user.user_id)
+    db_user_role = await UserRoleDao.get_user_roles(db_user.user_id)
     role = ""
     role_ids = []
     for user_role in db_user_role:
@@ -122,9 +127,9 @@ def get_user_role(db_user: UserTable):
     return role
 
 
-def get_user_jwt(db_user: UserTable):
+async def get_user_jwt(db_user: UserTable):
     # 查询角色
-    role = get_user_role(db_user)
+    role = await get_user_role(db_user)
     # 生成JWT令牌
     payload = {"user_name": db_user.user_name, "user_id": db_user.user_id, "role": role}
 
@@ -1,11 +1,172 @@
+import asyncio
+import time
+from collections import OrderedDict
 from typing import Literal, Optional
 
+import httpx
 from langchain.tools import tool
-from tavily import TavilyClient
+from tavily.errors import (
+    BadRequestError,
+    ForbiddenError,
+    InvalidAPIKeyError,
+    MissingAPIKeyError,
+    TimeoutError,
+    UsageLimitExceededError,
+)
+from toolmind.settings import app_settings
+from toolmind.utils import md5_hash
+
+TAVILY_BASE_URL = "https://api.tavily.com"
+DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_CONCURRENCY_PER_KEY = 4
+DEFAULT_CACHE_TTL = 60 * 10
+DEFAULT_CACHE_SIZE = 512
+
+
+class WebSearchClient:
+    """
+    Tavily 异步搜索客户端。
+
+    进程内共享一个 httpx 连接池，按 API Key 限制并发，
+    并按 (query, topic, time_range, max_results) 缓存格式化后的结果。
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency_per_key: int = DEFAULT_MAX_CONCURRENCY_PER_KEY,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_concurrency_per_key = max_concurrency_per_key
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            # 配置文件在应用启动后才加载，因此在首次使用时读取
+            base_url = (
+                self.base_url
+                or app_settings.web_search.get("base_url")
+                or TAVILY_BASE_URL
+            )
+            self._client = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=self.timeout,
+                headers={"Content-Type": "application/json"},
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+
+    def _get_semaphore(self, api_key: str) -> asyncio.Semaphore:
+        key = md5_hash(api_key)
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.max_concurrency_per_key)
+        return self._semaphores[key]
+
+    def _get_cached(self, key: tuple) -> Optional[str]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        expires_at, content = cached
+        if expires_at <= time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return content
+
+    def _set_cached(self, key: tuple, content: str) -> None:
+        self._cache[key] = (time.monotonic() + self.cache_ttl, content)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def raw_search(self, api_key: str, query: str, **params) -> dict:
+        """调用 Tavily /search 接口，错误类型与 tavily-python 保持一致"""
+        if not api_key:
+            raise MissingAPIKeyError()
+
+        data = {"query": query, **{k: v for k, v in params.items() if v is not None}}
+        async with self._get_semaphore(api_key):
+            try:
+                response = await self._get_client().post(
+                    "/search",
+                    json=data,
+                    headers={"Authorization": f"Bearer {api_key}"},
+                )
+            except httpx.TimeoutException:
+                raise TimeoutError(self.timeout)
+
+        if response.status_code == 200:
+            return response.json()
+
+        detail = ""
+        try:
+            detail = response.json().get("detail", {}).get("error", None)
+        except Exception:
+            pass
+        if response.status_code == 429:
+            raise UsageLimitExceededError(detail)
+        if response.status_code in [403, 432, 433]:
+            raise ForbiddenError(detail)
+        if response.status_code == 401:
+            raise InvalidAPIKeyError(detail)
+        if response.status_code == 400:
+            raise BadRequestError(detail)
+        response.raise_for_status()
+        return response.json()
+
+    async def search(
+        self,
+        query: str,
+        topic: Optional[str] = None,
+        max_results: Optional[int] = None,
+        time_range: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> str:
+        """联网搜索并返回拼接后的文本，命中缓存时不发起请求"""
+        # 缓存命中也要求配置了 API Key，未配置的用户不能读到他人的搜索结果
+        if not api_key:
+            raise MissingAPIKeyError()
+        key = (query, topic, time_range, max_results)
+        if (content := self._get_cached(key)) is not None:
+            return content
+
+        response = await self.raw_search(
+            api_key,
+            query,
+            country="china",
+            topic=topic,
+            time_range=time_range,
+            max_results=max_results,
+        )
+        content = "\n\n".join(
+            [
+                f'网址:{result["url"]}, 内容: {result["content"]}'
+                for result in response.get("results", [])
+            ]
+        )
+        self._set_cached(key, content)
+        return content
+
+    async def close(self) -> None:
+        """关闭连接池（应用退出时调用）"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+web_search_client = WebSearchClient()
 
 
 @tool("web_search", parse_docstring=True)
-def web_search(
+async def web_search(
     query: str,
     topic: Optional[str],
     max_results: Optional[int],
@@ -24,27 +185,5 @@ def web_search(
         将联网搜索到的信息返回给用户
     """
     # Note: `web_search` is typically called via LangChain agent.
-    # The actual executing logic is mostly handled in `_process_tools_result` in `agent.py` where we bypass normal tool execution.
-    return _web_search(query, topic, max_results, time_range)
-
-
-def _web_search(query, topic, max_results, time_range, api_key: str = None):
-    """使用 Tavily Search 工具进行联网搜索"""
-    if not api_key:
-        raise ValueError("Tavily API key is required")
-
-    tavily_client = TavilyClient(api_key=api_key)
-    response = tavily_client.search(
-        query=query,
-        country="china",
-        topic=topic,
-        time_range=time_range,
-        max_results=max_results,
-    )
-
-    return "\n\n".join(
-        [
-            f'网址:{result["url"]}, 内容: {result["content"]}'
-            for result in response["results"]
-        ]
-    )
+    # The actual executing logic is handled in `ToolManager.process_tool_result`, which passes the user's API key.
+    return await web_search_client.search(query, topic, max_results, time_range)
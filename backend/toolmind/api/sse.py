@@ -0,0 +1,134 @@
+"""
+SSE 传输层：编码、合并、心跳与背压
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+import orjson
+from loguru import logger
+from starlette.requests import Request
+
+# 合并相邻 token 事件的时间窗口（秒）与字节上限
+DEFAULT_COALESCE_WINDOW = 0.05
+DEFAULT_COALESCE_MAX_BYTES = 4096
+DEFAULT_HEARTBEAT_INTERVAL = 15
+# 单个连接最多缓冲的事件数，写满后生产者（Agent 运行）会等待客户端消费
+DEFAULT_MAX_BUFFER = 256
+DEFAULT_COALESCE_EVENTS = ("task_result",)
+
+HEARTBEAT = b": ping\n\n"
+
+_END = object()
+
+
+def encode_event(event: dict) -> bytes:
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+class SSEStream:
+    """
+    将事件异步迭代器转换为 SSE 字节流。
+
+    生产者在独立任务中运行，事件写入有界队列；同类 token 事件在时间或字节窗口内合并为一条，
+    空闲时发送注释行保活；客户端断开时取消生产者，停止继续消耗 LLM Token。
+    """
+
+    def __init__(
+        self,
+        events: AsyncIterator[dict],
+        request: Optional[Request] = None,
+        coalesce_events: Iterable[str] = DEFAULT_COALESCE_EVENTS,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        coalesce_max_bytes: int = DEFAULT_COALESCE_MAX_BYTES,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+    ):
+        self.events = events
+        self.request = request
+        self.coalesce_events = set(coalesce_events)
+        self.coalesce_window = coalesce_window
+        self.coalesce_max_bytes = coalesce_max_bytes
+        self.heartbeat_interval = heartbeat_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+        # 合并过程中取出但不可合并的事件，留到下一轮发送
+        self._pending = None
+
+    async def _produce(self) -> None:
+        try:
+            async for event in self.events:
+                await self._queue.put(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            await self._queue.put(err)
+        else:
+            await self._queue.put(_END)
+
+    def _coalescable(self, event) -> bool:
+        return (
+            isinstance(event, dict)
+            and event.get("event") in self.coalesce_events
+            and isinstance(event.get("data", {}).get("message"), str)
+        )
+
+    async def _next(self, timeout: float):
+        if self._pending is not None:
+            item, self._pending = self._pending, None
+            return item
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    async def _coalesce(self, event: dict) -> dict:
+        """在窗口内把后续同类事件的 message 拼接到当前事件"""
+        parts = [event["data"]["message"]]
+        size = len(parts[0].encode("utf-8"))
+        deadline = time.monotonic() + self.coalesce_window
+        while size < self.coalesce_max_bytes:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await self._next(timeout)
+            except asyncio.TimeoutError:
+                break
+            if not (self._coalescable(item) and item["event"] == event["event"]):
+                self._pending = item
+                break
+            parts.append(item["data"]["message"])
+            size += len(parts[-1].encode("utf-8"))
+
+        if len(parts) == 1:
+            return event
+        return {**event, "data": {**event["data"], "message": "".join(parts)}}
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        producer = asyncio.create_task(self._produce())
+        try:
+            while True:
+                try:
+                    item = await self._next(self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    if self.request is not None and await self.request.is_disconnected():
+                        logger.info("SSE client disconnected, cancel agent run")
+                        return
+                    yield HEARTBEAT
+                    continue
+
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                if self._coalescable(item):
+                    item = await self._coalesce(item)
+                yield encode_event(item)
+        finally:
+            # 正常结束、客户端断开（生成器被取消/关闭）都会走到这里
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+                except Exception as err:
+                    logger.warning(f"SSE producer failed while cancelling: {err}")
@@ -3,6 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from toolmind.api.services import UserPayload, get_login_user
+from toolmind.core.agents.model import ModelManager
 from toolmind.database.dao import AgentConfigDao
 from toolmind.schema import resp_200, resp_500
 
@@ -37,6 +38,7 @@ async def update_agent_config(
             tool_call_model_id=req.tool_call_model_id,
             reasoning_model_id=req.reasoning_model_id,
         )
+        ModelManager.invalidate_user(login_user.user_id)
         return resp_200(data=config.to_dict())
     except Exception as e:
         return resp_500(message=str(e))
@@ -1,8 +1,9 @@
-import json
+from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
 from starlette.responses import StreamingResponse
 from toolmind.api.services import SessionService, UserPayload, get_login_user
+from toolmind.api.sse import SSEStream
 from toolmind.core.agents import Agent
 from toolmind.schema import AgentTask, resp_200
 from toolmind.utils import set_user_id_context
@@ -10,42 +11,70 @@ from toolmind.utils import set_user_id_context
 router = APIRouter(tags=["Session"])
 
 
-@router.get("/sessions", summary="获取所有会话列表")
-async def get_sessions(login_user: UserPayload = Depends(get_login_user)):
-    results = await SessionService.get_sessions(login_user.user_id)
+@router.get("/sessions", summary="分页获取会话列表")
+async def get_sessions(
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    login_user: UserPayload = Depends(get_login_user),
+):
+    try:
+        results = await SessionService.get_sessions(login_user.user_id, cursor, limit)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
     return resp_200(data=results)
 
 
 @router.post("/sessions", summary="创建会话并开始执行 Agent 任务")
 async def create_session(
-    *, task: AgentTask, login_user: UserPayload = Depends(get_login_user)
+    *,
+    task: AgentTask,
+    request: Request,
+    login_user: UserPayload = Depends(get_login_user),
 ):
     # 设置全局变量统计调用
     set_user_id_context(login_user.user_id)
 
     agent_instance = Agent(login_user.user_id)
 
-    async def general_generate():
-        async for chunk in agent_instance.submit_agent_task(task):
-            yield f"data: {json.dumps(chunk)}\n\n"
-
-    return StreamingResponse(general_generate(), media_type="text/event-stream")
+    # 客户端断开时 SSEStream 会取消 Agent 运行
+    stream = SSEStream(agent_instance.submit_agent_task(task), request)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/sessions/{session_id}", summary="进入会话")
 async def session_info(
     session_id: str,
+    turn_limit: Optional[int] = Query(None, ge=1, description="只返回最近的轮数"),
     login_user: UserPayload = Depends(get_login_user),
 ):
     try:
         result = await SessionService.get_session_from_id(
-            session_id, login_user.user_id
+            session_id, login_user.user_id, turn_limit
         )
         return resp_200(data=result)
     except Exception as err:
         raise HTTPException(status_code=500, detail=str(err))
 
 
+@router.get("/sessions/{session_id}/turns", summary="分页获取会话的历史轮次")
+async def session_turns(
+    session_id: str,
+    before_seq: Optional[int] = Query(None, description="返回该序号之前的轮次"),
+    limit: int = Query(20, ge=1, le=100),
+    login_user: UserPayload = Depends(get_login_user),
+):
+    result = await SessionService.get_session_turns(
+        session_id, login_user.user_id, before_seq, limit
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return resp_200(data=result)
+
+
 @router.delete("/sessions/{session_id}", summary="删除会话")
 async def delete_session(
     session_id: str,
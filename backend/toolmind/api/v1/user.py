@@ -18,20 +18,20 @@ async def register(
     user_password: str = Body(description="用户密码"),
 ):
 
-    exist_user = UserDao.get_user_by_username(user_name)
+    exist_user = await UserDao.get_user_by_username(user_name)
     if exist_user:
         raise HTTPException(status_code=500, detail="用户名重复")
     if len(user_name) > 20:
         raise HTTPException(status_code=500, detail="用户名长度不应该超过20")
     try:
         user_password = UserService.encrypt_sha256_password(user_password)
-        admin = UserDao.get_user(AdminUser)
+        admin = await UserDao.get_user(AdminUser)
 
         if admin:
-            UserDao.add_user_and_default_role(user_name, user_password)
+            await UserDao.add_user_and_default_role(user_name, user_password)
         else:
             user_id = AdminUser
-            UserDao.add_user_and_admin_role(user_id, user_name, user_password)
+            await UserDao.add_user_and_admin_role(user_id, user_name, user_password)
     except Exception as e:
         logger.error(f"register user is appear error: {e}")
         raise HTTPException(
@@ -47,7 +47,7 @@ async def login(
     Authorize: AuthJWT = Depends(),
 ):
 
-    db_user = UserDao.get_user_by_username(user_name)
+    db_user = await UserDao.get_user_by_username(user_name)
     # 检查密码
     if not db_user or not UserService.verify_password(
         user_password, db_user.user_password
@@ -57,7 +57,7 @@ async def login(
     if db_user.delete:
         raise HTTPException(status_code=500, detail="该账号已被禁用，请联系管理员")
 
-    access_token, refresh_token, role = get_user_jwt(db_user)
+    access_token, refresh_token, role = await get_user_jwt(db_user)
 
     # Set the JWT cookies in the response
     Authorize.set_access_cookies(access_token)
@@ -77,7 +77,7 @@ async def login(
 
 @router.get("/users/{user_id}", response_model=UnifiedResponseModel)
 async def get_user_info(user_id: str):
-    result = UserService.get_user_info_by_id(user_id)
+    result = await UserService.get_user_info_by_id(user_id)
 
     return resp_200(result)
 
@@ -98,7 +98,7 @@ async def get_user_list(
     page: int = 1, limit: int = 20, admin_user: UserPayload = Depends(require_admin)
 ):
     """管理员获取用户列表"""
-    data = UserManagementService.get_user_list(page, limit)
+    data = await UserManagementService.get_user_list(page, limit)
     return resp_200(data)
 
 
@@ -115,7 +115,7 @@ async def update_user_role(
     if user_id == admin_user.user_id:
         return resp_500(message="你不能修改你自己的角色")
 
-    return UserManagementService.update_user_role(user_id, req.role)
+    return await UserManagementService.update_user_role(user_id, req.role)
 
 
 @router.patch("/users/{user_id}/status", response_model=UnifiedResponseModel)
@@ -131,11 +131,11 @@ async def toggle_user_status(
     # 如果不是超级管理员，只能禁用普通用户
     if admin_user.user_id != "1":
         # 获取目标用户角色
-        target_user_role = UserManagementService.get_user_role_str(user_id)
+        target_user_role = await UserManagementService.get_user_role_str(user_id)
         if target_user_role == "admin" or user_id == "1":
             return resp_500(message="普通管理员只能禁用普通用户的账号")
 
-    return UserManagementService.toggle_user_status(user_id, req.enable)
+    return await UserManagementService.toggle_user_status(user_id, req.enable)
 
 
 @router.post("/users/logout", response_model=UnifiedResponseModel)
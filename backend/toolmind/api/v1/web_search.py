@@ -1,6 +1,11 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from toolmind.api.services import UserPayload, get_login_user
+from tavily.errors import (
+    InvalidAPIKeyError,
+    MissingAPIKeyError,
+    UsageLimitExceededError,
+)
+from toolmind.api.services import UserPayload, get_login_user, web_search_client
 from toolmind.database.dao import WebSearchDao
 from toolmind.schema import resp_200, resp_500
 
@@ -30,15 +35,11 @@ async def get_web_search_config(login_user: UserPayload = Depends(get_login_user
 async def update_web_search_config(
     req: WebSearchReq, login_user: UserPayload = Depends(get_login_user)
 ):
-    from tavily import TavilyClient
-    from tavily.errors import MissingAPIKeyError, InvalidAPIKeyError, UsageLimitExceededError
-
     error_msg = None
     # 仅当传了 api_key 时才测试
     if req.api_key:
         try:
-            tavily_client = TavilyClient(api_key=req.api_key)
-            tavily_client.search(query="test", max_results=1)
+            await web_search_client.raw_search(req.api_key, "test", max_results=1)
         except MissingAPIKeyError:
             error_msg = "Tavily API Key 为空"
             req.enabled = False
@@ -0,0 +1,204 @@
+"""
+工具调用循环的上下文预算：截断超长工具输出、压缩早期轮次、限制工具轮数
+"""
+
+import re
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from loguru import logger
+from toolmind.core.agents.tool_manager import ToolManager
+from toolmind.core.callbacks import UsageMetadataCallback
+
+# 单条工具输出的 token 上限，超出部分截断
+DEFAULT_MAX_TOOL_OUTPUT_TOKENS = 3000
+# 消息总量超过该值时压缩早期轮次的工具输出
+DEFAULT_COMPACT_THRESHOLD_TOKENS = 12000
+# 压缩时保留完整内容的最近工具轮数
+DEFAULT_KEEP_RECENT_ROUNDS = 2
+# 压缩后的工具输出保留的 token 数
+DEFAULT_COMPACTED_TOOL_OUTPUT_TOKENS = 200
+# 单个步骤最多进行的工具调用轮数，超过后要求模型直接作答
+DEFAULT_MAX_TOOL_ROUNDS = 6
+
+FINAL_ANSWER_INSTRUCTION = (
+    "工具调用轮数已达上限，请不要再调用工具，直接基于已有信息给出最终回答。"
+)
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符按 1 个计，其余字符约 4 个计 1 个"""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        text = content
+    else:
+        text = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text += str(message.tool_calls)
+    return text
+
+
+def estimate_messages_tokens(messages: List[BaseMessage]) -> int:
+    return sum(estimate_tokens(_message_text(message)) for message in messages)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """按 token 预算截取文本开头，保留截断说明"""
+    total = estimate_tokens(text)
+    if total <= max_tokens:
+        return text
+    # 按比例换算字符数，中文与英文混排时近似即可
+    keep_chars = max(int(len(text) * max_tokens / total), 1)
+    return f"{text[:keep_chars]}\n...[内容过长已截断，原文约 {total} tokens]"
+
+
+def _truncate_content(content, max_tokens: int):
+    """截断消息内容：多段内容（如 MCP 返回的多个文本块）按顺序共享预算，非文本段原样保留"""
+    if isinstance(content, str):
+        return _truncate(content, max_tokens)
+    parts = []
+    remaining = max_tokens
+    for part in content:
+        if isinstance(part, str):
+            text = part
+        elif isinstance(part, dict) and part.get("type") == "text":
+            text = part.get("text", "")
+        else:
+            parts.append(part)
+            continue
+        # 预算用尽后的文本段直接丢弃，前一段的截断说明已提示内容不完整
+        if remaining <= 0:
+            continue
+        truncated = _truncate(text, remaining)
+        remaining -= estimate_tokens(text)
+        if isinstance(part, str):
+            parts.append(truncated)
+        else:
+            parts.append({**part, "text": truncated})
+    return parts
+
+
+class ContextBudget:
+    """工具调用循环的消息预算管理"""
+
+    def __init__(
+        self,
+        max_tool_output_tokens: int = DEFAULT_MAX_TOOL_OUTPUT_TOKENS,
+        compact_threshold_tokens: int = DEFAULT_COMPACT_THRESHOLD_TOKENS,
+        keep_recent_rounds: int = DEFAULT_KEEP_RECENT_ROUNDS,
+        compacted_tool_output_tokens: int = DEFAULT_COMPACTED_TOOL_OUTPUT_TOKENS,
+        max_tool_rounds: int = DEFAULT_MAX_TOOL_ROUNDS,
+    ):
+        self.max_tool_output_tokens = max_tool_output_tokens
+        self.compact_threshold_tokens = compact_threshold_tokens
+        self.keep_recent_rounds = keep_recent_rounds
+        self.compacted_tool_output_tokens = compacted_tool_output_tokens
+        self.max_tool_rounds = max_tool_rounds
+
+    def truncate_tool_messages(
+        self, tool_messages: List[ToolMessage]
+    ) -> List[ToolMessage]:
+        """截断超过单条上限的工具输出"""
+        for message in tool_messages:
+            message.content = _truncate_content(
+                message.content, self.max_tool_output_tokens
+            )
+        return tool_messages
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        消息总量超过阈值时，将最近几轮之前的工具输出压缩为摘录。
+
+        只缩短 ToolMessage 内容，保留 tool_call 与结果的对应关系，满足接口对消息顺序的要求。
+        每条消息只压缩一次，已压缩的内容不再改写，之后的轮次仍能命中提示词缓存。
+        """
+        if estimate_messages_tokens(messages) <= self.compact_threshold_tokens:
+            return messages
+
+        round_starts = [
+            index
+            for index, message in enumerate(messages)
+            if isinstance(message, AIMessage) and message.tool_calls
+        ]
+        if len(round_starts) <= self.keep_recent_rounds:
+            return messages
+
+        if self.keep_recent_rounds:
+            boundary = round_starts[-self.keep_recent_rounds]
+        else:
+            boundary = len(messages)
+        for message in messages[:boundary]:
+            if isinstance(message, ToolMessage) and not message.response_metadata.get(
+                "compacted"
+            ):
+                message.content = _truncate_content(
+                    message.content, self.compacted_tool_output_tokens
+                )
+                message.response_metadata["compacted"] = True
+        return messages
+
+    async def run_tool_loop(
+        self,
+        label: str,
+        model,
+        messages: List[BaseMessage],
+        tool_manager: ToolManager,
+    ) -> AIMessage:
+        """
+        执行多轮工具调用直至模型给出最终回答，返回最后一条 AIMessage。
+
+        达到最大工具轮数后追加提示，仍使用绑定工具的模型并指定 tool_choice="none" 作答：
+        工具定义保持不变，历史中的 tool_calls 仍可被接口接受，也不破坏提示词缓存的前缀。
+        """
+        rounds = 0
+        while True:
+            self.compact(messages)
+            response = await model.ainvoke(
+                input=messages, config={"callbacks": [UsageMetadataCallback()]}
+            )
+            self._log_round(label, rounds, messages, response)
+            messages.append(response)
+
+            if not response.tool_calls:
+                return response
+
+            rounds += 1
+            tool_messages = await tool_manager.parse_function_call_response(response)
+            messages.extend(self.truncate_tool_messages(tool_messages))
+
+            if rounds >= self.max_tool_rounds:
+                logger.warning(f"[{label}] Reached max tool rounds {rounds}")
+                messages.append(HumanMessage(content=FINAL_ANSWER_INSTRUCTION))
+                self.compact(messages)
+                response = await model.ainvoke(
+                    input=messages,
+                    config={"callbacks": [UsageMetadataCallback()]},
+                    tool_choice="none",
+                )
+                self._log_round(label, rounds, messages, response)
+                messages.append(response)
+                return response
+
+    @staticmethod
+    def _log_round(
+        label: str, rounds: int, messages: List[BaseMessage], response: AIMessage
+    ) -> None:
+        usage: Optional[dict] = getattr(response, "usage_metadata", None)
+        input_tokens = usage.get("input_tokens") if usage else None
+        estimated = estimate_messages_tokens(messages)
+        logger.info(
+            f"[{label}] round {rounds}: {len(messages)} messages, "
+            f"prompt tokens {input_tokens} (estimated {estimated})"
+        )
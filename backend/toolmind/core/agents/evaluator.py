@@ -6,11 +6,11 @@ from typing import List
 
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from loguru import logger
+from toolmind.core.agents.context_budget import ContextBudget
 from toolmind.core.agents.model import ModelManager
 from toolmind.core.agents.state import AgentState
 from toolmind.core.agents.tool_manager import ToolManager
-from toolmind.core.callbacks import UsageMetadataCallback
-from toolmind.prompts import EvaluateResultPrompt
+from toolmind.prompts import EvaluateResultInputPrompt, EvaluateResultPrompt
 from toolmind.utils import extract_and_parse_json
 
 
@@ -20,37 +20,39 @@ class Evaluator:
     def __init__(self, user_id: str, tool_manager: ToolManager):
         self.user_id = user_id
         self.tool_manager = tool_manager
+        self.context_budget = ContextBudget()
+        self._eval_model = None
+
+    async def _get_eval_model(self):
+        """绑定本次运行的工具快照，重跑循环直接复用"""
+        if self._eval_model is None:
+            tools = await self.tool_manager.obtain_tools()
+            model = await ModelManager.get_reasoning_model(user_id=self.user_id)
+            self._eval_model = model.bind_tools(tools) if len(tools) else model
+        return self._eval_model
 
     async def __call__(self, state: AgentState) -> dict:
         """运行评估逻辑，支持多轮工具调用核查事实"""
         logger.info("[Evaluator] Start _evaluate_result...")
 
-        eval_prompt = EvaluateResultPrompt.format(
+        # 评判规则作为固定的系统消息，待评估内容放在其后
+        eval_input = EvaluateResultInputPrompt.format(
             query=state["query"], answer=state["final_response"]
         )
         messages: List[BaseMessage] = [
-            SystemMessage(content="你是一个专业的结果评判助手。"),
-            HumanMessage(content=eval_prompt),
+            SystemMessage(content=EvaluateResultPrompt),
+            HumanMessage(content=eval_input),
         ]
 
-        tools = await self.tool_manager.obtain_tools()
-        model = await ModelManager.get_reasoning_model(user_id=self.user_id)
-        eval_model = model.bind_tools(tools) if len(tools) else model
+        eval_model = await self._get_eval_model()
 
         # 循环调用工具进行事实核查，直至给出最终评分
-        while True:
-            response = await eval_model.ainvoke(
-                input=messages, config={"callbacks": [UsageMetadataCallback]}
-            )
-            messages.append(response)
-
-            if response.tool_calls:
-                tool_messages = await self.tool_manager.parse_function_call_response(
-                    response
-                )
-                messages.extend(tool_messages)
-            else:
-                break
+        response = await self.context_budget.run_tool_loop(
+            "Evaluator",
+            eval_model,
+            messages,
+            self.tool_manager,
+        )
 
         content = response.content.strip()
         eval_res = extract_and_parse_json(content)
@@ -60,8 +62,4 @@ class Evaluator:
 
         logger.info(f"[Evaluator] Score: {score}, Reasoning: {reasoning}")
 
-        return {
-            "eval_score": score,
-            "eval_reasoning": reasoning,
-            "events": [],
-        }
+        return {"eval_score": score, "eval_reasoning": reasoning}
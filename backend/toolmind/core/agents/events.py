@@ -0,0 +1,54 @@
+"""
+单次运行的事件通道：节点写入 SSE 事件，编排器边读边发送
+"""
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+# 尚未发送给客户端的事件上限，写满后节点等待消费（背压）
+DEFAULT_MAX_PENDING_EVENTS = 256
+
+_CLOSED = object()
+
+
+class RunEventChannel:
+    """
+    有界事件队列，替代 AgentState 中不断累积的 events 列表。
+
+    事件发送后即从内存释放，无论回答多长、重跑多少轮，每个运行占用的内存保持平稳。
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING_EVENTS):
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._closed = False
+
+    def open(self) -> None:
+        """每次运行开始时重置通道"""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._closed = False
+
+    async def send(self, event: dict) -> None:
+        """写入事件，队列已满时等待编排器消费"""
+        if self._queue is None or self._closed:
+            return
+        await self._queue.put(event)
+
+    def close(self) -> None:
+        """图运行结束后调用，读端发送完剩余事件后退出"""
+        self._closed = True
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(_CLOSED)
+            except asyncio.QueueFull:
+                # 队列满时读端会在取空后根据 _closed 退出
+                pass
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        while True:
+            event = await self._queue.get()
+            if event is _CLOSED:
+                return
+            yield event
+            if self._closed and self._queue.empty():
+                return
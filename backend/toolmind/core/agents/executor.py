@@ -1,92 +1,267 @@
 """
-步骤执行节点：串行执行子任务，支持多轮工具调用
+步骤执行节点：按依赖图并发（或串行）执行子任务，支持多轮工具调用
 """
 
+import asyncio
 import json
-from typing import List
+from typing import Dict, List, Optional
 
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from loguru import logger
+from toolmind.core.agents.context_budget import ContextBudget
+from toolmind.core.agents.events import RunEventChannel
 from toolmind.core.agents.model import ModelManager
+from toolmind.core.agents.scheduler import (
+    QUERY_INPUT,
+    StepGraphError,
+    resolve_step_dependencies,
+    serial_dependencies,
+    step_content_hashes,
+)
+from toolmind.core.agents.speculation import StepSpeculation
 from toolmind.core.agents.state import AgentState
 from toolmind.core.agents.tool_manager import ToolManager
-from toolmind.core.callbacks import UsageMetadataCallback
-from toolmind.prompts import ToolCallPrompt
+from toolmind.prompts import ToolCallInputPrompt, ToolCallPrompt
+from toolmind.schema import AgentTaskStep
+
+DAG_MODE = "dag"
+SERIAL_MODE = "serial"
+
+# 单次请求内同时执行的步骤数上限
+DEFAULT_MAX_PARALLEL_STEPS = 3
 
 
 class Executor:
     """子任务执行节点"""
 
-    def __init__(self, user_id: str, tool_manager: ToolManager):
+    def __init__(
+        self,
+        user_id: str,
+        tool_manager: ToolManager,
+        event_channel: RunEventChannel,
+        mode: str = DAG_MODE,
+        max_parallel_steps: int = DEFAULT_MAX_PARALLEL_STEPS,
+        speculation: Optional[StepSpeculation] = None,
+    ):
         self.user_id = user_id
         self.tool_manager = tool_manager
+        self.event_channel = event_channel
+        self.mode = mode
+        self.max_parallel_steps = max_parallel_steps
+        self.speculation = speculation or StepSpeculation()
+        # 推测执行与依赖图调度共享并发名额
+        self._step_semaphore = asyncio.Semaphore(max_parallel_steps)
+        self.context_budget = ContextBudget()
+        self._tool_call_models: Dict[tuple, object] = {}
 
-    async def __call__(self, state: AgentState) -> dict:
-        """执行当前步骤的 AI 推理与工具调用"""
-        tools = await self.tool_manager.obtain_tools()
-        model = await ModelManager.get_agent_intent_model(user_id=self.user_id)
-        tool_call_model = model.bind_tools(tools) if len(tools) else model
+    async def _get_tool_call_model(self, tools: list):
+        """按工具集合绑定模型并缓存，后续步骤与重跑循环直接复用"""
+        key = tuple(tool.get("function", tool)["name"] for tool in tools)
+        if key not in self._tool_call_models:
+            model = await ModelManager.get_agent_intent_model(user_id=self.user_id)
+            self._tool_call_models[key] = model.bind_tools(tools) if tools else model
+        return self._tool_call_models[key]
 
+    async def __call__(self, state: AgentState) -> dict:
+        """执行子任务：DAG 模式一次性并发调度全部步骤，串行模式每次执行一步"""
         steps = state.get("steps", [])
         context_task = state.get("context_task", [])
-        events = []
 
         if len(context_task) >= len(steps):
             return {}
 
-        # 确定当前执行步骤及其上下文
-        step_index = len(context_task)
-        step_info = steps[step_index]
-        tasks_graph = {step.step_id: step for step in steps}
+        if self.mode == DAG_MODE:
+            update = await self._execute_dag(state)
+        else:
+            update = await self._execute_serial(state)
+
+        if len(update["context_task"]) >= len(steps):
+            # 全部步骤执行完毕，未被认领的推测任务不再需要
+            self.speculation.cancel_all()
+        return update
+
+    def speculate(
+        self, step_info: AgentTaskStep, query: str, step_results: Dict[str, str]
+    ) -> None:
+        """规划仍在生成时提前执行只依赖用户问题的步骤，结果按内容哈希供执行阶段认领"""
+        if any(input_step != QUERY_INPUT for input_step in step_info.input):
+            return
+        step_hash = step_content_hashes([step_info], {step_info.step_id: []})[
+            step_info.step_id
+        ]
+        if step_hash in step_results or self.speculation.has(step_hash):
+            return
+        logger.info(f"Speculatively start step {step_info.step_id}: {step_info.title}")
+        self.speculation.start(
+            step_hash, self._run_detached_step(step_info.model_copy(), query)
+        )
+
+    async def _run_detached_step(self, step_info: AgentTaskStep, query: str) -> str:
+        async with self._step_semaphore:
+            await self._run_step(step_info, [step_info], query)
+        return step_info.result
+
+    async def _execute_serial(self, state: AgentState) -> dict:
+        """执行当前步骤，由条件边循环驱动后续步骤"""
+        steps = state.get("steps", [])
+        context_task = state.get("context_task", [])
+
+        try:
+            hashes = step_content_hashes(steps, resolve_step_dependencies(steps))
+        except StepGraphError:
+            hashes = {}
+        step_results = dict(state.get("step_results", {}))
+
+        step_info = steps[len(context_task)]
+        step_hash = hashes.get(step_info.step_id)
+        await self._run_cached_step(
+            step_info, steps, state["query"], step_hash, step_results
+        )
+        new_context_task = context_task + [step_info.model_dump()]
+        await self.event_channel.send(self._step_event(step_info))
+
+        return {
+            "context_task": new_context_task,
+            "steps": steps,
+            "step_results": step_results,
+        }
+
+    async def _execute_dag(self, state: AgentState) -> dict:
+        """按依赖图调度：前置步骤全部完成的步骤并发执行，完成即推送结果"""
+        steps = state.get("steps", [])
+        query = state["query"]
 
-        tools_summary = self.tool_manager.get_tools_summary()
-        tools_str = json.dumps(tools_summary, ensure_ascii=False, indent=2)
+        try:
+            dependencies = resolve_step_dependencies(steps)
+            nodes = {step.step_id: step for step in steps}
+            hashes = step_content_hashes(steps, dependencies)
+        except StepGraphError as err:
+            logger.warning(f"Invalid step graph, fallback to serial execution: {err}")
+            # 重复的 step_id 用下标区分，保证每一步都会执行
+            nodes = {
+                f"{index}:{step.step_id}": step for index, step in enumerate(steps)
+            }
+            dependencies = serial_dependencies(list(nodes))
+            hashes = {}
+
+        step_results = dict(state.get("step_results", {}))
+        done_events = {key: asyncio.Event() for key in nodes}
+
+        async def run_node(key: str):
+            for dep in dependencies[key]:
+                await done_events[dep].wait()
+            step_info = nodes[key]
+            step_hash = hashes.get(key)
+            if step_hash in step_results or self.speculation.has(step_hash):
+                # 复用上一轮结果或等待推测执行的结果，不占用并发名额
+                await self._run_cached_step(
+                    step_info, steps, query, step_hash, step_results
+                )
+            else:
+                async with self._step_semaphore:
+                    await self._run_cached_step(
+                        step_info, steps, query, step_hash, step_results
+                    )
+            await self.event_channel.send(self._step_event(step_info))
+            done_events[key].set()
+
+        async with asyncio.TaskGroup() as task_group:
+            for key in nodes:
+                task_group.create_task(run_node(key))
+
+        # 按规划顺序汇总结果，保证聚合节点看到的上下文顺序稳定
+        new_context_task = [step.model_dump() for step in steps]
+        return {
+            "context_task": new_context_task,
+            "steps": steps,
+            "step_results": step_results,
+        }
+
+    async def _run_cached_step(
+        self,
+        step_info: AgentTaskStep,
+        steps: List[AgentTaskStep],
+        query: str,
+        step_hash: Optional[str],
+        step_results: Dict[str, str],
+    ) -> None:
+        """内容哈希命中前几轮的结果或推测执行时直接复用，否则执行并记录结果"""
+        if step_hash and step_hash in step_results:
+            step_info.result = step_results[step_hash]
+            logger.info(f"Reuse result of step {step_info.step_id}: {step_info.title}")
+            return
+
+        speculative = self.speculation.take(step_hash) if step_hash else None
+        if speculative is None or not await self._await_speculative(
+            step_info, speculative
+        ):
+            await self._run_step(step_info, steps, query)
+        if step_hash and step_info.result:
+            step_results[step_hash] = step_info.result
+
+    @staticmethod
+    async def _await_speculative(
+        step_info: AgentTaskStep, speculative: asyncio.Task
+    ) -> bool:
+        """等待推测执行的结果；推测任务失败或被取消时返回 False，由调用方重新执行"""
+        try:
+            step_info.result = await speculative
+        except asyncio.CancelledError:
+            # 当前任务被取消时继续向上抛出，仅推测任务自身被取消时才重新执行
+            if asyncio.current_task().cancelling():
+                raise
+            logger.warning(f"Speculative step {step_info.step_id} was cancelled")
+            return False
+        except Exception as err:
+            logger.warning(f"Speculative step {step_info.step_id} failed: {err}")
+            return False
+        logger.info(
+            f"Use speculative result of step {step_info.step_id}: {step_info.title}"
+        )
+        return True
+
+    async def _run_step(
+        self, step_info: AgentTaskStep, steps: List[AgentTaskStep], query: str
+    ) -> None:
+        """执行单个步骤的多轮工具调用，结果写回 step_info.result"""
+        await self.tool_manager.obtain_tools()
+        tools, tools_str = self.tool_manager.select_tools(
+            f"{step_info.title} {step_info.target} {step_info.workflow} {query}"
+        )
+        tool_call_model = await self._get_tool_call_model(tools)
+        tasks_graph = {step.step_id: step for step in steps}
 
         step_context = []
         for input_step in step_info.input:
             if input_step in tasks_graph:
                 step_context.append(tasks_graph[input_step].model_dump())
 
-        step_prompt = ToolCallPrompt.format(
-            step_info=step_info.model_dump(),
+        # 系统消息只含说明与工具目录，在所有步骤间逐字节相同；步骤相关内容放在其后
+        step_input = ToolCallInputPrompt.format(
+            step_info=json.dumps(step_info.model_dump(), ensure_ascii=False, indent=2),
             step_context=json.dumps(step_context, ensure_ascii=False, indent=2),
-            tools_str=tools_str,
-            user_query=state["query"],
+            user_query=query,
         )
         step_messages: List[BaseMessage] = [
-            SystemMessage(content=step_prompt),
-            HumanMessage(content=state["query"]),
+            SystemMessage(content=ToolCallPrompt.format(tools_str=tools_str)),
+            HumanMessage(content=step_input),
         ]
 
-        # 循环执行直至模型给出最终答复（不再调用工具）
-        step_summary = ""
-        while True:
-            response = await tool_call_model.ainvoke(
-                input=step_messages,
-                config={"callbacks": [UsageMetadataCallback]},
-            )
-            step_messages.append(response)
-
-            if response.tool_calls:
-                tool_messages = await self.tool_manager.parse_function_call_response(
-                    response
-                )
-                step_messages.extend(tool_messages)
-            else:
-                step_summary = response.content or ""
-                break
-
-        step_info.result = step_summary
-        new_context_task = context_task + [step_info.model_dump()]
-
-        events.append(
-            {
-                "event": "step_result",
-                "data": {
-                    "message": step_info.result or " ",
-                    "title": step_info.title,
-                },
-            }
+        # 循环执行直至模型给出最终答复（不再调用工具），超出轮数上限时禁止调用工具直接作答
+        response = await self.context_budget.run_tool_loop(
+            f"Executor {step_info.step_id}",
+            tool_call_model,
+            step_messages,
+            self.tool_manager,
         )
+        step_info.result = response.content or ""
 
-        return {"context_task": new_context_task, "events": events, "steps": steps}
+    @staticmethod
+    def _step_event(step_info: AgentTaskStep) -> dict:
+        return {
+            "event": "step_result",
+            "data": {
+                "message": step_info.result or " ",
+                "title": step_info.title,
+            },
+        }
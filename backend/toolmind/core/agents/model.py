@@ -2,14 +2,33 @@
 模型管理器
 """
 
-from typing import Optional
+import json
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 from langchain_core.language_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 from toolmind.database.dao import AgentConfigDao, LLMDao
+from toolmind.utils import md5_hash
+
+# 进程内最多缓存的模型客户端数量
+MAX_CACHED_MODELS = 128
+# 用户模型配置的缓存时长（秒），兜底其他进程更新配置后本进程无法主动失效的情况
+MODEL_CONFIG_TTL = 60
 
 
 class ModelManager:
+    """
+    按用户配置创建对话模型。
+
+    模型客户端按 (user_id, config_type, LLM 配置指纹) 做 LRU 缓存，复用底层 HTTP 连接；
+    用户的模型配置同样做 LRU 缓存并带有短 TTL，/agent-config 与 /llms 更新时主动失效。
+    """
+
+    _models: "OrderedDict[Tuple[str, str, str], BaseChatModel]" = OrderedDict()
+    # (user_id, config_type) -> (过期时间, 模型配置)
+    _configs: "OrderedDict[Tuple[str, str], Tuple[float, dict]]" = OrderedDict()
 
     @classmethod
     async def _get_model_config(cls, user_id: str, config_type: str) -> Optional[dict]:
@@ -42,11 +61,20 @@ class ModelManager:
     ) -> BaseChatModel:
         """获取 ChatOpenAI 实例"""
 
-        model_config = await cls._get_model_config(user_id, config_type)
-        if not model_config:
-            raise ValueError(
-                f"User {user_id} has no {config_type} model configuration in database"
-            )
+        model_config = cls._get_cached_config(user_id, config_type)
+        if model_config is None:
+            model_config = await cls._get_model_config(user_id, config_type)
+            if not model_config:
+                raise ValueError(
+                    f"User {user_id} has no {config_type} model configuration in database"
+                )
+            cls._cache_config(user_id, config_type, model_config)
+
+        key = (user_id, config_type, cls._fingerprint(model_config))
+        model = cls._models.get(key)
+        if model is not None:
+            cls._models.move_to_end(key)
+            return model
 
         model = ChatOpenAI(
             stream_usage=True,
@@ -54,8 +82,62 @@ class ModelManager:
             api_key=model_config["api_key"],
             base_url=model_config["base_url"],
         )
+        cls._models[key] = model
+        while len(cls._models) > MAX_CACHED_MODELS:
+            cls._models.popitem(last=False)
         return model
 
+    @classmethod
+    def _get_cached_config(cls, user_id: str, config_type: str) -> Optional[dict]:
+        key = (user_id, config_type)
+        cached = cls._configs.get(key)
+        if cached is None:
+            return None
+        expires_at, model_config = cached
+        if expires_at <= time.monotonic():
+            cls._configs.pop(key, None)
+            return None
+        cls._configs.move_to_end(key)
+        return model_config
+
+    @classmethod
+    def _cache_config(cls, user_id: str, config_type: str, model_config: dict):
+        key = (user_id, config_type)
+        cls._configs[key] = (time.monotonic() + MODEL_CONFIG_TTL, model_config)
+        cls._configs.move_to_end(key)
+        while len(cls._configs) > MAX_CACHED_MODELS:
+            cls._configs.popitem(last=False)
+
+    @staticmethod
+    def _fingerprint(model_config: dict) -> str:
+        """LLM 记录的版本标识：连接相关字段任一变化都会生成新的模型实例"""
+        fields = {
+            key: model_config.get(key)
+            for key in ("llm_id", "model", "api_key", "base_url")
+        }
+        return md5_hash(json.dumps(fields, sort_keys=True))
+
+    @classmethod
+    def invalidate_user(cls, user_id: str):
+        """用户的 Agent 模型配置变更后调用"""
+        for key in [key for key in cls._configs if key[0] == user_id]:
+            cls._configs.pop(key, None)
+        for key in [key for key in cls._models if key[0] == user_id]:
+            cls._models.pop(key, None)
+
+    @classmethod
+    def invalidate_llm(cls, llm_id: str):
+        """LLM 配置更新或删除后调用，清除所有引用它的缓存"""
+        stale = [
+            key
+            for key, (_, model_config) in cls._configs.items()
+            if model_config.get("llm_id") == llm_id
+        ]
+        for key in stale:
+            cls._configs.pop(key, None)
+        for key in [key for key in cls._models if key[:2] in stale]:
+            cls._models.pop(key, None)
+
     @classmethod
     async def get_tool_invocation_model(
         cls, user_id: str = None, **kwargs
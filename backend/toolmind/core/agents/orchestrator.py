@@ -3,14 +3,23 @@ LangGraph 编排器 — Agent 核心入口
 基于状态机驱动任务流转：规划 -> 执行 -> 聚合 -> 评估
 """
 
+import asyncio
+import time
+from contextlib import suppress
+from datetime import datetime
+
 from langgraph.graph import END, START, StateGraph
-from toolmind.api.services import SessionService
+from loguru import logger
+from toolmind.api.services import session_writer
 from toolmind.core.agents.evaluator import Evaluator
+from toolmind.core.agents.events import RunEventChannel
 from toolmind.core.agents.executor import Executor
 from toolmind.core.agents.model import ModelManager
 from toolmind.core.agents.planner import Planner
+from toolmind.core.agents.speculation import StepSpeculation
 from toolmind.core.agents.state import AgentState
 from toolmind.core.agents.synthesizer import Synthesizer
+from toolmind.core.agents.title import direct_title, title_cache
 from toolmind.core.agents.tool_manager import ToolManager
 from toolmind.core.callbacks import UsageMetadataCallback
 from toolmind.database.models import SessionContext, SessionCreate
@@ -18,21 +27,59 @@ from toolmind.prompts import GenerateTitlePrompt
 from toolmind.schema import AgentTask
 
 
-async def _increment_loop(state: AgentState) -> dict:
-    """每次进入规划前递增循环计数"""
-    new_count = state.get("loop_count", 0) + 1
-    events = []
-    if new_count > 1:
-        events.append(
-            {
-                "event": "step_result",
-                "data": {
-                    "message": "正在重新规划任务并重头执行...",
-                    "title": f"第 {new_count} 次重跑",
-                },
-            }
+def _make_increment_loop(event_channel: RunEventChannel):
+    async def _increment_loop(state: AgentState) -> dict:
+        """每次进入规划前递增循环计数"""
+        new_count = state.get("loop_count", 0) + 1
+        if new_count > 1:
+            await event_channel.send(
+                {
+                    "event": "step_result",
+                    "data": {
+                        "message": "正在重新规划任务，未变化的步骤将复用已有结果...",
+                        "title": f"第 {new_count} 次重跑",
+                    },
+                }
+            )
+        return {"loop_count": new_count}
+
+    return _increment_loop
+
+
+def _make_report(event_channel: RunEventChannel):
+    async def _report(state: AgentState) -> dict:
+        """每轮评估结束后，推送评估反馈并持久化本轮结果"""
+        score = state.get("eval_score", 0)
+        reasoning = state.get("eval_reasoning", "")
+
+        if score >= 80:
+            feedback_msg = (
+                f"\n\n\n> **✅ 自我反馈通过** (匹配度: {score}/100)\n"
+                f"> **理由**: {reasoning}\n\n---\n\n"
+            )
+        else:
+            feedback_msg = (
+                f"\n\n\n> **⚠️ 自我反馈未通过** (匹配度: {score}/100)\n"
+                f"> **理由**: {reasoning}\n\n---\n\n"
+            )
+
+        await event_channel.send(
+            {"event": "task_result", "data": {"message": feedback_msg}}
         )
-    return {"loop_count": new_count, "events": events}
+
+        # 交给后台写入器持久化，不阻塞事件推送
+        await session_writer.append_turn(
+            state["session_model"].session_id,
+            SessionContext(
+                query=state["query"],
+                task=state.get("context_task", []),
+                task_graph=state.get("tasks_show", []),
+                answer=state.get("final_response", "") + feedback_msg,
+            ).model_dump(),
+        )
+        return {}
+
+    return _report
 
 
 def _should_retry(state: AgentState) -> str:
@@ -43,7 +90,7 @@ def _should_retry(state: AgentState) -> str:
 
 
 def _should_continue_executing(state: AgentState) -> str:
-    """条件边：决定是否继续执行下一个子任务"""
+    """条件边：决定是否继续执行下一个子任务（DAG 模式下一次执行完全部步骤）"""
     steps = state.get("steps", [])
     context_task = state.get("context_task", [])
     if len(context_task) < len(steps):
@@ -51,23 +98,32 @@ def _should_continue_executing(state: AgentState) -> str:
     return "synthesizer"
 
 
-def _build_graph(user_id: str, tool_manager: ToolManager):
+def _build_graph(
+    user_id: str,
+    tool_manager: ToolManager,
+    event_channel: RunEventChannel,
+    speculation: StepSpeculation,
+):
     """构建并编译 LangGraph 状态机"""
 
-    planner = Planner(user_id, tool_manager)
-    executor = Executor(user_id, tool_manager)
-    synthesizer = Synthesizer(user_id)
+    executor = Executor(user_id, tool_manager, event_channel, speculation=speculation)
+    # 规划流式生成时，只依赖用户问题的步骤交给执行节点提前执行
+    planner = Planner(
+        user_id, tool_manager, event_channel, on_step_ready=executor.speculate
+    )
+    synthesizer = Synthesizer(user_id, event_channel)
     evaluator = Evaluator(user_id, tool_manager)
 
     graph = StateGraph(AgentState)
 
-    graph.add_node("increment_loop", _increment_loop)
+    graph.add_node("increment_loop", _make_increment_loop(event_channel))
     graph.add_node("planner", planner)
     graph.add_node("executor", executor)
     graph.add_node("synthesizer", synthesizer)
     graph.add_node("evaluator", evaluator)
+    graph.add_node("report", _make_report(event_channel))
 
-    # 编排节点流向：START -> increment_loop -> planner -> executor -> synthesizer -> evaluator
+    # 编排节点流向：START -> increment_loop -> planner -> executor -> synthesizer -> evaluator -> report
     graph.add_edge(START, "increment_loop")
     graph.add_edge("increment_loop", "planner")
     graph.add_edge("planner", "executor")
@@ -78,9 +134,10 @@ def _build_graph(user_id: str, tool_manager: ToolManager):
         {"executor": "executor", "synthesizer": "synthesizer"},
     )
     graph.add_edge("synthesizer", "evaluator")
+    graph.add_edge("evaluator", "report")
 
     graph.add_conditional_edges(
-        "evaluator",
+        "report",
         _should_retry,
         {"retry": "increment_loop", "end": END},
     )
@@ -94,12 +151,17 @@ class Agent:
     def __init__(self, user_id: str):
         self.user_id = user_id
         self.tool_manager = ToolManager(user_id)
-        self.graph = _build_graph(user_id, self.tool_manager)
+        self.event_channel = RunEventChannel()
+        self.speculation = StepSpeculation()
+        self.graph = _build_graph(
+            user_id, self.tool_manager, self.event_channel, self.speculation
+        )
 
     async def submit_agent_task(self, agent_task: AgentTask):
         """主入口：创建会话、驱动状态机并推送事件"""
 
-        session_model = await SessionService.create_session(
+        # 会话 ID 在应用内生成，写库由后台写入器完成，首个事件无需等待数据库
+        session_model = await session_writer.create_session(
             SessionCreate(title="新对话", user_id=self.user_id, contexts=[])
         )
 
@@ -108,72 +170,101 @@ class Agent:
             "data": {
                 "session_id": session_model.session_id,
                 "title": session_model.title,
-                "create_time": (
-                    session_model.create_time.isoformat()
-                    if session_model.create_time
-                    else None
-                ),
+                "create_time": datetime.now().isoformat(),
             },
         }
 
-        initial_state: AgentState = {
-            "query": agent_task.query,
-            "user_id": self.user_id,
-            "steps": [],
-            "tasks_show": [],
-            "context_task": [],
-            "final_response": "",
-            "eval_score": 0,
-            "eval_reasoning": "",
-            "loop_count": 0,
-            "max_loop": 3,
-            "session_model": session_model,
-            "events": [],
-        }
+        # 标题只依赖问题本身，与图并发生成，事件经同一通道穿插推送
+        self.event_channel.open()
+        title_task = asyncio.create_task(
+            self._generate_title(session_model, agent_task.query)
+        )
+        graph_task = None
+        try:
+            # 每次运行只解析一次工具快照，各节点共享
+            await self.tool_manager.prepare()
+
+            initial_state: AgentState = {
+                "query": agent_task.query,
+                "user_id": self.user_id,
+                "steps": [],
+                "tasks_show": [],
+                "context_task": [],
+                "final_response": "",
+                "eval_score": 0,
+                "eval_reasoning": "",
+                "loop_count": 0,
+                "max_loop": 3,
+                "session_model": session_model,
+            }
+
+            # 图在独立任务中运行，节点事件经有界通道边产生边发送
+            graph_task = asyncio.create_task(
+                self._run_graph(initial_state, title_task)
+            )
+            run_start_at = time.perf_counter()
+            first_token_logged = False
+            async for event in self.event_channel:
+                if not first_token_logged and event.get("event") == "task_result":
+                    first_token_logged = True
+                    elapsed = (time.perf_counter() - run_start_at) * 1000
+                    logger.info(f"First answer token after {elapsed:.0f}ms")
+                yield event
+            await graph_task
+        finally:
+            # 客户端断开等情况下取消仍在运行的图与标题生成
+            for task in (graph_task, title_task):
+                if task is not None and not task.done():
+                    task.cancel()
+                    with suppress(asyncio.CancelledError):
+                        await task
+
+    async def _run_graph(
+        self, initial_state: AgentState, title_task: asyncio.Task
+    ) -> None:
+        try:
+            await self.graph.ainvoke(initial_state)
+            # 标题通常早已完成；未完成时等它推送完再关闭通道
+            await title_task
+        finally:
+            # 运行出错或被取消时，提前启动的步骤一并取消
+            self.speculation.cancel_all()
+            self.event_channel.close()
+            logger.info(f"Tool result cache: {self.tool_manager.result_cache.stats()}")
+
+    async def _generate_title(self, session_model, query: str) -> None:
+        """生成会话标题并持久化：短问题直接使用，重复问题命中缓存，否则流式生成"""
+        started_at = time.perf_counter()
+        final_title = direct_title(query) or title_cache.get(query)
+        try:
+            if final_title is None:
+                final_title = await self._stream_title(session_model, query)
+                title_cache.set(query, final_title)
+        except Exception as err:
+            # 标题生成失败不影响任务本身，保留默认标题
+            logger.warning(f"Generate session title failed: {err}")
+            return
+
+        await session_writer.update_session(
+            session_model.session_id,
+            self.user_id,
+            title=final_title,
+            is_pinned=None,
+        )
+        await self.event_channel.send(
+            {
+                "event": "session_updated",
+                "data": {
+                    "session_id": session_model.session_id,
+                    "title": final_title,
+                },
+            }
+        )
+        elapsed = (time.perf_counter() - started_at) * 1000
+        logger.info(f"Session title ready after {elapsed:.0f}ms")
 
-        final_state = initial_state
-        async for update in self.graph.astream(initial_state, stream_mode="updates"):
-            for node_name, state_update in update.items():
-
-                # 实时推送节点 SSE 事件并合并状态
-                for sse_event in state_update.get("events", []):
-                    yield sse_event
-                final_state = {**final_state, **state_update}
-
-                # 评估结束后，推送统计并持久化
-                if node_name == "evaluator":
-                    score = final_state.get("eval_score", 0)
-                    reasoning = final_state.get("eval_reasoning", "")
-
-                    if score >= 80:
-                        feedback_msg = (
-                            f"\n\n\n> **✅ 自我反馈通过** (匹配度: {score}/100)\n"
-                            f"> **理由**: {reasoning}\n\n---\n\n"
-                        )
-                    else:
-                        feedback_msg = (
-                            f"\n\n\n> **⚠️ 自我反馈未通过** (匹配度: {score}/100)\n"
-                            f"> **理由**: {reasoning}\n\n---\n\n"
-                        )
-
-                    yield {"event": "task_result", "data": {"message": feedback_msg}}
-
-                    final_response = final_state.get("final_response", "")
-                    await SessionService.update_session_contexts(
-                        session_model.session_id,
-                        SessionContext(
-                            query=agent_task.query,
-                            task=final_state.get("context_task", []),
-                            task_graph=final_state.get("tasks_show", []),
-                            answer=final_response + feedback_msg,
-                        ).model_dump(),
-                    )
-
-        async for event in self._stream_title(session_model, agent_task.query):
-            yield event
-
-    async def _stream_title(self, session_model, query: str):
-        """流式生成会话标题并持久化"""
+    async def _stream_title(self, session_model, query: str) -> str:
+        """流式生成会话标题，逐块推送"""
         title_prompt = GenerateTitlePrompt.format(query=query)
         conversation_model = await ModelManager.get_conversation_model(
             user_id=self.user_id
@@ -182,33 +273,20 @@ class Agent:
         streamed_title = ""
         async for title_chunk in conversation_model.astream(
             input=title_prompt,
-            config={"callbacks": [UsageMetadataCallback]},
+            config={"callbacks": [UsageMetadataCallback()]},
         ):
             chunk_content = getattr(title_chunk, "content", "") or ""
             if not chunk_content:
                 continue
             streamed_title += chunk_content
-            yield {
-                "event": "session_title_chunk",
-                "data": {
-                    "session_id": session_model.session_id,
-                    "title": streamed_title,
-                },
-            }
-
-        final_title = streamed_title.strip() or "新对话"
-
-        await SessionService.update_session(
-            session_model.session_id,
-            self.user_id,
-            title=final_title,
-            is_pinned=None,
-        )
-
-        yield {
-            "event": "session_updated",
-            "data": {
-                "session_id": session_model.session_id,
-                "title": final_title,
-            },
-        }
+            await self.event_channel.send(
+                {
+                    "event": "session_title_chunk",
+                    "data": {
+                        "session_id": session_model.session_id,
+                        "title": streamed_title,
+                    },
+                }
+            )
+
+        return streamed_title.strip() or "新对话"
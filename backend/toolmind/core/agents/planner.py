@@ -3,24 +3,47 @@
 """
 
 import json
-from typing import List
+from typing import Awaitable, Callable, Dict, List, Optional
 
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from loguru import logger
+from pydantic import ValidationError
+from toolmind.core.agents.events import RunEventChannel
 from toolmind.core.agents.model import ModelManager
 from toolmind.core.agents.state import AgentState
 from toolmind.core.agents.tool_manager import ToolManager
 from toolmind.core.callbacks import UsageMetadataCallback
-from toolmind.prompts import FixJsonPrompt, GenerateTaskPrompt
+from toolmind.prompts import (
+    FixJsonPrompt,
+    GenerateTaskInputPrompt,
+    GenerateTaskPrompt,
+    ReplanTaskInputPrompt,
+    ReplanTaskPrompt,
+)
 from toolmind.schema import AgentTaskStep
-from toolmind.utils import extract_and_parse_json
+from toolmind.utils import StreamingJsonArrayParser, parse_json_with_repair
+
+# 重规划时展示给模型的上一轮结果长度上限
+REPLAN_RESULT_PREVIEW_CHARS = 800
+
+# 规划流式输出中单个步骤生成完毕时的回调：(步骤, 用户问题, 已有步骤结果)
+StepReadyCallback = Callable[[AgentTaskStep, str, Dict[str, str]], None]
 
 
 class Planner:
     """任务规划节点"""
 
-    def __init__(self, user_id: str, tool_manager: ToolManager):
+    def __init__(
+        self,
+        user_id: str,
+        tool_manager: ToolManager,
+        event_channel: RunEventChannel,
+        on_step_ready: Optional[StepReadyCallback] = None,
+    ):
         self.user_id = user_id
         self.tool_manager = tool_manager
+        self.event_channel = event_channel
+        self.on_step_ready = on_step_ready
 
     async def __call__(self, state: AgentState) -> dict:
         """执行规划，更新任务流"""
@@ -31,26 +54,54 @@ class Planner:
         for t in tools_summary:
             logger.info(f"  - {t.get('name')}: {t.get('description')}")
 
-        tools_str = json.dumps(tools_summary, ensure_ascii=False, indent=2)
+        tools_str = self.tool_manager.get_tools_prompt()
 
-        agent_task_prompt = GenerateTaskPrompt.format(
-            tools_str=tools_str,
-            query=state["query"],
-        )
+        # 重跑轮次基于上一轮规划增量调整，未改动的步骤复用已有结果
+        previous_steps = []
+        if state.get("loop_count", 1) > 1:
+            previous_steps = state.get("steps", [])
+        if previous_steps:
+            messages = self._replan_messages(state, previous_steps, tools_str)
+        else:
+            # 静态说明与工具目录在前、用户问题在后，保持提示词前缀稳定
+            messages = [
+                SystemMessage(content=GenerateTaskPrompt.format(tools_str=tools_str)),
+                HumanMessage(
+                    content=GenerateTaskInputPrompt.format(query=state["query"])
+                ),
+            ]
 
-        response_task = await self._generate_tasks(agent_task_prompt)
+        # 流式生成规划：每个步骤生成完毕即更新任务图，只依赖用户问题的步骤提前开始执行
+        streamed_steps: List[AgentTaskStep] = []
+        sent_graph: List[Dict[str, str]] = []
 
-        # 构建步骤对象
-        tasks_graph: dict[str, AgentTaskStep] = {}
-        tasks_show = []
-        raw_steps = response_task.get("steps", [])
-        steps: List[AgentTaskStep] = []
-        for raw_step in raw_steps:
-            task_step = AgentTaskStep(**raw_step)
-            steps.append(task_step)
-            tasks_graph[task_step.step_id] = task_step
+        async def on_raw_step(raw_step: dict) -> None:
+            step = self._build_step(raw_step, previous_steps)
+            if step is None:
+                return
+            streamed_steps.append(step)
+            sent_graph[:] = self._tasks_show(streamed_steps)
+            await self.event_channel.send(
+                {"event": "generate_tasks", "data": {"graph": list(sent_graph)}}
+            )
+            if self.on_step_ready and not raw_step.get("reuse"):
+                self.on_step_ready(step, state["query"], state.get("step_results", {}))
+
+        steps = await self._generate_tasks(messages, on_raw_step, previous_steps)
+        tasks_show = self._tasks_show(steps)
+
+        # 完整解析的结果与流式推送的一致时不再重复推送
+        if tasks_show != sent_graph:
+            await self.event_channel.send(
+                {"event": "generate_tasks", "data": {"graph": tasks_show}}
+            )
+        return {"steps": steps, "tasks_show": tasks_show, "context_task": []}
 
-        # 转换并构建前端展示的任务图数据
+    @staticmethod
+    def _tasks_show(steps: List[AgentTaskStep]) -> List[Dict[str, str]]:
+        """转换并构建前端展示的任务图数据"""
+        tasks_graph = {step.step_id: step for step in steps}
+        tasks_show = []
         for step_info in steps:
             if not step_info.input:
                 tasks_show.append({"start": "用户问题", "end": step_info.title})
@@ -65,32 +116,146 @@ class Planner:
                         )
                     else:
                         tasks_show.append({"start": "用户问题", "end": step_info.title})
+        return tasks_show
+
+    @staticmethod
+    def _replan_messages(
+        state: AgentState, previous_steps: List[AgentTaskStep], tools_str: str
+    ) -> List[BaseMessage]:
+        """带上一轮步骤、结果与评估意见的增量重规划消息"""
+        previous_payload = [
+            {
+                "step_id": step.step_id,
+                "title": step.title,
+                "target": step.target,
+                "workflow": step.workflow,
+                "input": step.input,
+                "result": step.result[:REPLAN_RESULT_PREVIEW_CHARS],
+            }
+            for step in previous_steps
+        ]
+        replan_input = ReplanTaskInputPrompt.format(
+            eval_score=state.get("eval_score", 0),
+            eval_reasoning=state.get("eval_reasoning", ""),
+            previous_steps=json.dumps(previous_payload, ensure_ascii=False, indent=2),
+            query=state["query"],
+        )
+        return [
+            SystemMessage(content=ReplanTaskPrompt.format(tools_str=tools_str)),
+            HumanMessage(content=replan_input),
+        ]
+
+    @staticmethod
+    def _build_step(
+        raw_step: dict, previous_steps: List[AgentTaskStep]
+    ) -> Optional[AgentTaskStep]:
+        """流式解析出的单个步骤，无效时返回 None，由完整解析阶段统一报错"""
+        if raw_step.get("reuse"):
+            for previous_step in previous_steps:
+                if previous_step.step_id == raw_step.get("step_id"):
+                    return previous_step.model_copy()
+            return None
+        try:
+            return AgentTaskStep(**raw_step)
+        except ValidationError:
+            return None
 
-        return {
-            "steps": steps,
-            "tasks_show": tasks_show,
-            "events": [{"event": "generate_tasks", "data": {"graph": tasks_show}}],
-        }
+    @staticmethod
+    def _build_steps(
+        raw_steps: List[dict], previous_steps: List[AgentTaskStep]
+    ) -> List[AgentTaskStep]:
+        """解析规划结果，reuse 标记的步骤沿用上一轮的定义"""
+        previous = {step.step_id: step for step in previous_steps}
+        steps: List[AgentTaskStep] = []
+        reused = 0
+        for raw_step in raw_steps:
+            if not isinstance(raw_step, dict):
+                continue
+            if raw_step.get("reuse"):
+                step_id = raw_step.get("step_id")
+                previous_step = previous.get(step_id)
+                if previous_step is None:
+                    logger.warning(f"Reuse unknown step {step_id}, ignored")
+                    continue
+                # 复制一份，避免执行时改写上一轮的步骤对象
+                steps.append(previous_step.model_copy())
+                reused += 1
+            else:
+                # 输出被截断时最后一个步骤可能缺少字段，丢弃该步骤而不是中断整个运行
+                try:
+                    steps.append(AgentTaskStep(**raw_step))
+                except ValidationError as err:
+                    logger.warning(
+                        f"Invalid plan step {raw_step.get('step_id')} dropped: {err}"
+                    )
+        if previous_steps:
+            logger.info(f"Replan: {reused}/{len(steps)} steps marked as reused")
+        return steps
 
-    async def _generate_tasks(self, agent_task_prompt) -> dict:
-        """调用 LLM 生成任务 JSON"""
+    @staticmethod
+    def _raw_steps(response_task) -> List[dict]:
+        """取出规划结果中的 steps 列表，结构不符时抛出 ValueError"""
+        if isinstance(response_task, dict) and isinstance(
+            response_task.get("steps"), list
+        ):
+            return response_task["steps"]
+        raise ValueError("规划结果缺少 steps 列表")
+
+    def _parse_steps(
+        self, content: str, previous_steps: List[AgentTaskStep]
+    ) -> List[AgentTaskStep]:
+        """本地修复并解析规划 JSON，没有有效步骤时抛出 ValueError"""
+        steps = self._build_steps(
+            self._raw_steps(parse_json_with_repair(content)), previous_steps
+        )
+        if not steps:
+            raise ValueError("规划结果中没有有效的步骤")
+        return steps
+
+    async def _generate_tasks(
+        self,
+        messages: List[BaseMessage],
+        on_raw_step: Callable[[dict], Awaitable[None]],
+        previous_steps: List[AgentTaskStep],
+    ) -> List[AgentTaskStep]:
+        """
+        流式调用 LLM 生成任务 JSON 并解析为步骤，steps 中每个元素闭合时回调 on_raw_step。
+
+        完整输出先在本地修复，缺少字段的步骤（如被截断的最后一步）直接丢弃；
+        没有有效步骤时改用流式解析出的步骤，两者都没有时才请求模型修复 JSON。
+        """
         conversation_model = await ModelManager.get_conversation_model(
             user_id=self.user_id
         )
-        response = await conversation_model.ainvoke(
-            input=agent_task_prompt, config={"callbacks": [UsageMetadataCallback]}
-        )
+        parser = StreamingJsonArrayParser("steps")
+        content = ""
+        async for chunk in conversation_model.astream(
+            input=messages, config={"callbacks": [UsageMetadataCallback()]}
+        ):
+            text = chunk.content if isinstance(chunk.content, str) else ""
+            if not text:
+                continue
+            content += text
+            for raw_step in parser.feed(text):
+                await on_raw_step(raw_step)
 
         try:
-            return extract_and_parse_json(response.content)
-        except Exception as err:
+            return self._parse_steps(content, previous_steps)
+        except ValueError as err:
+            steps = self._build_steps(parser.items, previous_steps)
+            if steps:
+                logger.warning(
+                    f"Plan JSON is malformed ({err}), use {len(steps)} streamed steps"
+                )
+                return steps
+
             fix_message = FixJsonPrompt.format(
-                json_content=response.content, json_error=str(err)
+                json_content=content, json_error=str(err)
             )
             fix_response = await conversation_model.ainvoke(
-                input=fix_message, config={"callbacks": [UsageMetadataCallback]}
+                input=fix_message, config={"callbacks": [UsageMetadataCallback()]}
             )
             try:
-                return extract_and_parse_json(fix_response.content)
+                return self._parse_steps(fix_response.content, previous_steps)
             except Exception as fix_err:
                 raise ValueError(f"JSON 修复失败: {fix_err}")
@@ -0,0 +1,91 @@
+"""
+子任务依赖图：校验规划结果并给出可并行执行的拓扑顺序
+"""
+
+import json
+from typing import Dict, List
+
+from loguru import logger
+from toolmind.schema import AgentTaskStep
+from toolmind.utils import md5_hash
+
+# 指向用户问题本身的输入，不构成步骤之间的依赖
+QUERY_INPUT = "query"
+
+
+class StepGraphError(ValueError):
+    """规划结果无法构成有效的依赖图（重复 step_id 或存在环）"""
+
+
+def resolve_step_dependencies(steps: List[AgentTaskStep]) -> Dict[str, List[str]]:
+    """解析每个步骤依赖的前置步骤，缺失的 step_id 记录日志后忽略"""
+    step_ids = [step.step_id for step in steps]
+    if len(set(step_ids)) != len(step_ids):
+        duplicated = sorted({sid for sid in step_ids if step_ids.count(sid) > 1})
+        raise StepGraphError(f"重复的 step_id: {duplicated}")
+
+    known = set(step_ids)
+    dependencies: Dict[str, List[str]] = {}
+    for step in steps:
+        deps = []
+        for input_step in step.input:
+            if input_step == QUERY_INPUT:
+                continue
+            if input_step not in known:
+                logger.warning(
+                    f"Step {step.step_id} depends on unknown step {input_step}, ignored"
+                )
+                continue
+            if input_step == step.step_id:
+                raise StepGraphError(f"步骤 {step.step_id} 依赖自身")
+            if input_step not in deps:
+                deps.append(input_step)
+        dependencies[step.step_id] = deps
+
+    topological_layers(dependencies)
+    return dependencies
+
+
+def topological_layers(dependencies: Dict[str, List[str]]) -> List[List[str]]:
+    """按 Kahn 算法分层，同一层的步骤互不依赖；存在环时抛出 StepGraphError"""
+    remaining = {sid: set(deps) for sid, deps in dependencies.items()}
+    layers: List[List[str]] = []
+    while remaining:
+        ready = [sid for sid, deps in remaining.items() if not deps]
+        if not ready:
+            raise StepGraphError(f"步骤之间存在循环依赖: {sorted(remaining)}")
+        layers.append(ready)
+        for sid in ready:
+            remaining.pop(sid)
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return layers
+
+
+def serial_dependencies(keys: List[str]) -> Dict[str, List[str]]:
+    """依赖图无效时的兜底：按规划顺序串行执行"""
+    return {key: keys[index - 1 : index] for index, key in enumerate(keys)}
+
+
+def step_content_hashes(
+    steps: List[AgentTaskStep], dependencies: Dict[str, List[str]]
+) -> Dict[str, str]:
+    """
+    按 title、target、workflow 与输入计算步骤内容哈希。
+
+    输入中的前置步骤以其哈希参与计算，前置步骤内容变化时下游步骤的哈希随之变化，不会误用旧结果。
+    """
+    nodes = {step.step_id: step for step in steps}
+    hashes: Dict[str, str] = {}
+    for layer in topological_layers(dependencies):
+        for step_id in layer:
+            step = nodes[step_id]
+            inputs = [hashes.get(input_step, input_step) for input_step in step.input]
+            content = json.dumps(
+                [step.title, step.target, step.workflow, inputs],
+                ensure_ascii=False,
+                sort_keys=True,
+                default=str,
+            )
+            hashes[step_id] = md5_hash(content)
+    return hashes
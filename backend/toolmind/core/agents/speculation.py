@@ -0,0 +1,43 @@
+"""
+推测执行：规划仍在生成时提前启动的步骤，按步骤内容哈希登记，由执行节点认领结果
+"""
+
+import asyncio
+from typing import Coroutine, Dict, Optional
+
+from loguru import logger
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # 未被认领的任务失败时不再打印 "exception was never retrieved"，认领方仍会收到异常
+    if not task.cancelled():
+        task.exception()
+
+
+class StepSpeculation:
+    """单次运行内提前启动的步骤任务；最终规划中不再出现的步骤在执行结束后取消"""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def has(self, step_hash: Optional[str]) -> bool:
+        return step_hash in self._tasks
+
+    def start(self, step_hash: str, coroutine: Coroutine) -> None:
+        if step_hash in self._tasks:
+            coroutine.close()
+            return
+        task = asyncio.create_task(coroutine)
+        task.add_done_callback(_retrieve_exception)
+        self._tasks[step_hash] = task
+
+    def take(self, step_hash: Optional[str]) -> Optional[asyncio.Task]:
+        """认领提前启动的任务，认领后由调用方等待其结果"""
+        return self._tasks.pop(step_hash, None)
+
+    def cancel_all(self) -> None:
+        if self._tasks:
+            logger.info(f"Cancel {len(self._tasks)} unused speculative steps")
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -4,17 +4,12 @@ Agent 共享状态定义
 使用 LangGraph 的 TypedDict State，所有 Agent 节点通过读写 AgentState 进行数据传递。
 """
 
-from typing import Annotated, Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from toolmind.schema import AgentTaskStep
 from typing_extensions import TypedDict
 
 
-def _append_events(existing: List[dict], new: List[dict]) -> List[dict]:
-    """Reducer: 将新事件追加到已有事件列表"""
-    return existing + new
-
-
 class AgentState(TypedDict, total=False):
     """LangGraph 状态机的共享状态"""
 
@@ -28,6 +23,8 @@ class AgentState(TypedDict, total=False):
 
     # ── 执行结果 ──
     context_task: List[Dict[str, Any]]
+    # 步骤内容哈希 -> 执行结果，跨重跑轮次保留，供增量重规划复用
+    step_results: Dict[str, str]
 
     # ── 汇总 ──
     final_response: str
@@ -42,6 +39,3 @@ class AgentState(TypedDict, total=False):
 
     # ── 会话 ──
     session_model: Optional[Any]
-
-    # ── SSE 事件队列（每个节点产出的事件追加到此列表） ──
-    events: Annotated[List[dict], _append_events]
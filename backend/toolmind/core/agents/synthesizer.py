@@ -3,8 +3,11 @@
 """
 
 import json
+import time
 
 from langchain_core.messages import HumanMessage
+from loguru import logger
+from toolmind.core.agents.events import RunEventChannel
 from toolmind.core.agents.model import ModelManager
 from toolmind.core.agents.state import AgentState
 from toolmind.core.callbacks import UsageMetadataCallback
@@ -14,8 +17,9 @@ from toolmind.prompts import FinalSynthesisPrompt
 class Synthesizer:
     """最终汇总节点"""
 
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, event_channel: RunEventChannel):
         self.user_id = user_id
+        self.event_channel = event_channel
 
     async def __call__(self, state: AgentState) -> dict:
         """执行聚合逻辑并流式返回结果"""
@@ -34,22 +38,29 @@ class Synthesizer:
             steps_json=json.dumps(final_steps_payload, ensure_ascii=False, indent=2),
         )
 
+        # token 逐个写入事件通道，发送后即释放，不在状态中累积
         final_response = ""
-        events = []
+        first_token_at = None
+        start_at = time.perf_counter()
         conversation_model = await ModelManager.get_conversation_model(
             user_id=self.user_id
         )
         async for chunk in conversation_model.astream(
             [HumanMessage(content=synthesis_prompt)],
-            config={"callbacks": [UsageMetadataCallback]},
+            config={"callbacks": [UsageMetadataCallback()]},
         ):
+            if not chunk.content:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                ttft = (first_token_at - start_at) * 1000
+                logger.info(f"Synthesizer first token in {ttft:.0f}ms")
             final_response += chunk.content
-            events.append(
-                {
-                    "event": "task_result",
-                    "data": {"message": chunk.content},
-                }
+            await self.event_channel.send(
+                {"event": "task_result", "data": {"message": chunk.content}}
             )
 
-        events.append({"event": "evaluating_result", "data": {}})
-        return {"final_response": final_response, "events": events}
+        elapsed = (time.perf_counter() - start_at) * 1000
+        logger.info(f"Synthesizer finished in {elapsed:.0f}ms")
+        await self.event_channel.send({"event": "evaluating_result", "data": {}})
+        return {"final_response": final_response}
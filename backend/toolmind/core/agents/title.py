@@ -0,0 +1,61 @@
+"""
+会话标题：短问题直接作为标题，重复问题复用已生成的标题
+"""
+
+from collections import OrderedDict
+from typing import Optional
+
+from toolmind.settings import app_settings
+
+# 不超过该长度的单行问题直接作为标题，不调用模型（0 表示总是调用模型）
+DEFAULT_DIRECT_TITLE_MAX_CHARS = 12
+# 标题缓存的最大条目数（0 表示不缓存）
+DEFAULT_TITLE_CACHE_SIZE = 1024
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+def direct_title(query: str) -> Optional[str]:
+    """短问题本身就是合适的标题，返回 None 表示需要模型生成"""
+    max_chars = app_settings.session_title.get(
+        "direct_max_chars", DEFAULT_DIRECT_TITLE_MAX_CHARS
+    )
+    title = query.strip()
+    if max_chars and title and "\n" not in title and len(title) <= max_chars:
+        return title
+    return None
+
+
+class TitleCache:
+    """按规范化后的问题缓存生成的标题（进程内 LRU）"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._max_size = max_size
+        self._titles: OrderedDict[str, str] = OrderedDict()
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return app_settings.session_title.get("cache_size", DEFAULT_TITLE_CACHE_SIZE)
+
+    def get(self, query: str) -> Optional[str]:
+        key = _normalize_query(query)
+        title = self._titles.get(key)
+        if title is not None:
+            self._titles.move_to_end(key)
+        return title
+
+    def set(self, query: str, title: str) -> None:
+        if not self.max_size:
+            return
+        key = _normalize_query(query)
+        self._titles[key] = title
+        self._titles.move_to_end(key)
+        while len(self._titles) > self.max_size:
+            self._titles.popitem(last=False)
+
+
+title_cache = TitleCache()
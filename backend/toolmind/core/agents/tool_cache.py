@@ -0,0 +1,190 @@
+"""
+工具调用结果缓存：同一次运行内去重，只读结果可选 Redis 跨运行复用
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from loguru import logger
+from toolmind.core.mcp import mcp_tool_catalog
+from toolmind.database import redis_client
+from toolmind.settings import app_settings
+from toolmind.utils import TOOL_RESULT_CACHE_KEY, md5_hash
+
+
+def canonical_tool_args(tool_args: Optional[dict]) -> str:
+    """参数规范化：键排序、去掉空值，使等价调用得到相同的哈希"""
+    args = {k: v for k, v in (tool_args or {}).items() if v is not None}
+    return json.dumps(
+        args, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    )
+
+
+class ToolResultCache:
+    """
+    工具结果的两级缓存。
+
+    一级缓存随 ToolManager 存活于单次运行，命中同一步骤、不同步骤以及评估节点中的重复调用；
+    配置 redis.tool_cache_ttl 后，persistent 的结果（只读工具）同时写入 Redis 供后续运行复用。
+    调用失败的结果不缓存，并发的相同调用只实际执行一次。
+    缓存键包含工具所属的服务，同名工具在不同服务间不会互相命中。
+    """
+
+    def __init__(self, scope: str, redis_ttl: Optional[int] = None):
+        # scope 区分用户，避免个人配置的工具结果被其他用户复用
+        self.scope = scope
+        self.redis_ttl = (
+            redis_ttl
+            if redis_ttl is not None
+            else app_settings.redis.get("tool_cache_ttl", 0)
+        )
+        self._results: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def cache_key(
+        self, server: str, tool_name: str, tool_args: Optional[dict]
+    ) -> str:
+        return md5_hash(f"{server}:{tool_name}:{canonical_tool_args(tool_args)}")
+
+    async def get_or_call(
+        self,
+        tool_name: str,
+        tool_args: Optional[dict],
+        call: Callable[[], Awaitable[str]],
+        server: Optional[str] = None,
+        cacheable: bool = True,
+        persistent: bool = True,
+    ) -> str:
+        """
+        命中缓存直接返回，否则执行 call 并缓存结果；call 抛出的异常原样向上传递。
+
+        server 为工具所属服务的标识（MCP Server ID，内置工具为工具名），
+        cacheable 控制单次运行内去重，persistent 控制是否读写 Redis 跨运行缓存。
+        """
+        if not cacheable:
+            self.bypassed += 1
+            return await call()
+
+        server = server or tool_name
+        key = self.cache_key(server, tool_name, tool_args)
+        while True:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                content = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 发起调用的运行被取消时由当前等待者重新调用，自身被取消时继续向上抛出
+                if asyncio.current_task().cancelling():
+                    raise
+                continue
+            self.hits += 1
+            return content
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content = await self._redis_get(server, key) if persistent else None
+            if content is not None:
+                self.redis_hits += 1
+            else:
+                self.misses += 1
+                content = await call()
+                if persistent:
+                    await self._redis_set(server, key, content)
+            self._results[key] = content
+            future.set_result(content)
+            return content
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # 没有等待者时避免 "exception was never retrieved" 告警
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _redis_key(self, server: str, key: str) -> str:
+        return TOOL_RESULT_CACHE_KEY.format(self.scope, server, key)
+
+    async def _redis_get(self, server: str, key: str) -> Optional[str]:
+        if not self.redis_ttl:
+            return None
+        try:
+            return await asyncio.to_thread(
+                redis_client.get, self._redis_key(server, key)
+            )
+        except Exception as err:
+            logger.warning(f"Read tool result cache failed: {err}")
+            return None
+
+    async def _redis_set(self, server: str, key: str, content: str) -> None:
+        if not self.redis_ttl:
+            return
+        try:
+            await asyncio.to_thread(
+                redis_client.set,
+                self._redis_key(server, key),
+                content,
+                self.redis_ttl,
+            )
+        except Exception as err:
+            logger.warning(f"Write tool result cache failed: {err}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": (
+                round((self.hits + self.redis_hits) / lookups, 3) if lookups else 0.0
+            ),
+        }
+
+
+# 后台清理任务的引用，避免任务在完成前被回收
+_drop_tasks: Set[asyncio.Task] = set()
+
+
+def _delete_server_results(server: str) -> None:
+    pattern = TOOL_RESULT_CACHE_KEY.format("*", server, "*")
+    try:
+        deleted = redis_client.delete_pattern(pattern)
+    except Exception as err:
+        logger.warning(f"Drop cached tool results of server {server} failed: {err}")
+        return
+    if deleted:
+        logger.info(f"Drop {deleted} cached tool results of server {server}")
+
+
+def drop_server_results(server: str) -> None:
+    """
+    MCP Server 配置变更或删除时，清除该服务在 Redis 中的全部工具结果。
+
+    SCAN 与删除在线程中后台执行，不阻塞事件循环上的请求与 SSE 推送。
+    """
+    if not app_settings.redis.get("tool_cache_ttl", 0):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _delete_server_results(server)
+        return
+    task = loop.create_task(asyncio.to_thread(_delete_server_results, server))
+    _drop_tasks.add(task)
+    task.add_done_callback(_drop_tasks.discard)
+
+
+mcp_tool_catalog.add_invalidate_listener(drop_server_results)
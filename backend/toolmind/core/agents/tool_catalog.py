@@ -0,0 +1,60 @@
+"""
+工具目录：提示词中的紧凑工具列表与按步骤的相关性筛选
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List
+
+# 工具描述在目录中保留的最大字符数
+DEFAULT_DESCRIPTION_CHARS = 120
+
+_TERM_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+
+
+def render_tool_catalog(
+    tools_summary: List[dict], description_chars: int = DEFAULT_DESCRIPTION_CHARS
+) -> str:
+    """每个工具一行 `- name: 描述`，描述压成单行并截断"""
+    lines = []
+    for tool in tools_summary:
+        description = " ".join((tool.get("description") or "").split())
+        if description_chars and len(description) > description_chars:
+            description = description[:description_chars].rstrip() + "…"
+        lines.append(f"- {tool.get('name', '')}: {description}")
+    return "\n".join(lines)
+
+
+def _terms(text: str) -> List[str]:
+    """英文按单词、中文按相邻两字切分，用于粗粒度的词面匹配"""
+    terms = []
+    for match in _TERM_PATTERN.findall(text.lower()):
+        if match.isascii():
+            terms.append(match)
+        elif len(match) == 1:
+            terms.append(match)
+        else:
+            terms.extend(match[i : i + 2] for i in range(len(match) - 1))
+    return terms
+
+
+def rank_tools(tools_summary: List[dict], text: str, top_k: int) -> List[str]:
+    """按与 text 的词面重合度（IDF 加权）选出最相关的 top_k 个工具名，同分保持原顺序"""
+    documents = []
+    for tool in tools_summary:
+        name = tool.get("name", "").replace("_", " ")
+        documents.append(set(_terms(f"{name} {tool.get('description') or ''}")))
+    document_frequency = Counter(term for terms in documents for term in terms)
+    total = len(documents)
+    query_terms = set(_terms(text))
+
+    scores = []
+    for index, (tool, terms) in enumerate(zip(tools_summary, documents)):
+        score = sum(
+            math.log(1 + total / document_frequency[term])
+            for term in query_terms & terms
+        )
+        scores.append((-score, index, tool.get("name", "")))
+    scores.sort()
+    return [name for _, _, name in scores[:top_k]]
@@ -0,0 +1,74 @@
+"""
+工具调用调度：并发上限、超时与耗时统计
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+
+from loguru import logger
+
+# 单次运行内同时执行的工具调用数上限
+DEFAULT_MAX_CONCURRENCY_PER_RUN = 8
+# 同一工具服务（MCP Server / 内置工具）在整个进程内的并发上限
+DEFAULT_MAX_CONCURRENCY_PER_SERVER = 4
+# 单次工具调用的执行时限（秒），不含排队时间
+DEFAULT_TOOL_TIMEOUT = 60
+
+
+class ToolTimeoutError(TimeoutError):
+    """工具调用超过执行时限"""
+
+
+class ToolExecutor:
+    """
+    工具调用执行器。
+
+    每个运行一个实例，限制本次运行的总并发；按服务共享的信号量为进程级，
+    避免模型一次发出大量 tool_calls 时同时打开过多 MCP 连接。
+    """
+
+    _server_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY_PER_RUN,
+        max_concurrency_per_server: int = DEFAULT_MAX_CONCURRENCY_PER_SERVER,
+        timeout: float = DEFAULT_TOOL_TIMEOUT,
+    ):
+        self.max_concurrency_per_server = max_concurrency_per_server
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _get_server_semaphore(self, server_key: str) -> asyncio.Semaphore:
+        semaphores = ToolExecutor._server_semaphores
+        if server_key not in semaphores:
+            semaphores[server_key] = asyncio.Semaphore(self.max_concurrency_per_server)
+        return semaphores[server_key]
+
+    async def run(
+        self, tool_name: str, server_key: str, call: Callable[[], Awaitable[str]]
+    ) -> str:
+        """排队获取并发名额后执行 call，超时抛出 ToolTimeoutError"""
+        queued_at = time.perf_counter()
+        async with self._semaphore, self._get_server_semaphore(server_key):
+            started_at = time.perf_counter()
+            status = "ok"
+            try:
+                async with asyncio.timeout(self.timeout):
+                    return await call()
+            except TimeoutError:
+                status = "timeout"
+                raise ToolTimeoutError(f"执行超时（{self.timeout}s）")
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                wait_ms = (started_at - queued_at) * 1000
+                run_ms = (time.perf_counter() - started_at) * 1000
+                logger.info(
+                    f"Tool {tool_name} {status}: wait {wait_ms:.0f}ms, run {run_ms:.0f}ms"
+                )
@@ -3,28 +3,51 @@
 """
 
 import asyncio
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.tools.base import ToolException
 from langchain_core.utils.function_calling import convert_to_openai_tool
-from toolmind.api.services import MCPService, web_search
-from toolmind.core.mcp import MCPManager
+from toolmind.api.services import MCPService, web_search, web_search_client
+from toolmind.core.agents.tool_cache import ToolResultCache
+from toolmind.core.agents.tool_catalog import (
+    DEFAULT_DESCRIPTION_CHARS,
+    rank_tools,
+    render_tool_catalog,
+)
+from toolmind.core.agents.tool_executor import ToolExecutor, ToolTimeoutError
+from toolmind.core.mcp import mcp_tool_catalog
 from toolmind.schema import MCPConfig
+from toolmind.settings import app_settings
 from toolmind.utils import convert_mcp_config, mcp_tool_to_args_schema
 
 
 class ToolManager:
-    """工具管理器"""
+    """工具管理器
+
+    每次 Agent 运行持有一个实例，作为运行上下文：工具集合、OpenAI 工具 schema、
+    工具摘要以及 Web 搜索配置只在首次使用时解析一次，之后各节点与重跑循环共享同一份快照。
+    """
 
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.mcp_manager: Optional[MCPManager] = None
         self.mcp_tools = []
         self.tool_mcp_server_dict = {}
         self.tools = []
+        self.tools_summary: list[dict] = []
+        self.tools_prompt: str = ""
         self._web_search_enabled: bool = True
         self._web_search_api_key: Optional[str] = None
+        self._prepared = False
+        self._prepare_lock = asyncio.Lock()
+        self.result_cache = ToolResultCache(scope=user_id)
+        # 工具目录配置：描述截断长度、按步骤筛选的工具数（0 表示不筛选）
+        catalog_config = app_settings.tool_catalog
+        self.description_chars: int = catalog_config.get(
+            "description_chars", DEFAULT_DESCRIPTION_CHARS
+        )
+        self.top_k: int = catalog_config.get("top_k", 0)
+        self.tool_executor = ToolExecutor()
 
     async def _ensure_web_search_config(self):
         """获取并同步 Web 搜索配置"""
@@ -38,31 +61,73 @@ class ToolManager:
             self._web_search_enabled = True
             self._web_search_api_key = None
 
-    async def obtain_tools(self) -> list:
-        """汇总所有可用工具（内置 + MCP）"""
-        tools = []
-
-        # 内置搜索工具
-        await self._ensure_web_search_config()
-        if self._web_search_enabled:
-            tools.append(convert_to_openai_tool(web_search))
-
-        mcp_tools = await self._get_mcp_tools()
-        mcp_tools = [
-            mcp_tool_to_args_schema(tool.name, tool.description, tool.args_schema)
-            for tool in mcp_tools
-        ]
-        tools.extend(mcp_tools)
+    async def prepare(self):
+        """解析本次运行的工具快照（幂等，仅首次调用会访问数据库与 MCP 服务）"""
+        if self._prepared:
+            return
+
+        async with self._prepare_lock:
+            if self._prepared:
+                return
+
+            tools = []
 
-        self.tools = tools
-        return tools
+            # 内置搜索工具
+            await self._ensure_web_search_config()
+            if self._web_search_enabled:
+                tools.append(convert_to_openai_tool(web_search))
+
+            # 按名称排序，保证工具 schema 与提示词中的工具目录逐字节稳定，便于命中服务商的提示词缓存
+            mcp_tools = sorted(await self._get_mcp_tools(), key=lambda tool: tool.name)
+            mcp_tools = [
+                mcp_tool_to_args_schema(tool.name, tool.description, tool.args_schema)
+                for tool in mcp_tools
+            ]
+            tools.extend(mcp_tools)
+
+            self.tools = tools
+            self.tools_summary = self._build_tools_summary(tools)
+            self.tools_prompt = render_tool_catalog(
+                self.tools_summary, self.description_chars
+            )
+            self._prepared = True
+
+    async def obtain_tools(self) -> list:
+        """汇总所有可用工具（内置 + MCP），返回本次运行的工具快照"""
+        await self.prepare()
+        return self.tools
 
     def get_tools_summary(self) -> list[dict]:
         """提取工具摘要给 Planner（仅 name/description）"""
-        if not self.tools:
-            return []
+        return self.tools_summary
+
+    def get_tools_prompt(self) -> str:
+        """提示词中的紧凑工具目录（每行一个工具），每次运行只生成一次"""
+        return self.tools_prompt
+
+    def select_tools(self, text: str) -> Tuple[list, str]:
+        """
+        按与步骤内容的相关性选出 top_k 个工具，返回 (工具 schema, 工具目录)。
+
+        未开启筛选或工具数不超过 top_k 时返回完整快照；
+        开启后各步骤的工具集合不同，提示词前缀不再在步骤间共享。
+        """
+        if not self.top_k or len(self.tools) <= self.top_k:
+            return self.tools, self.tools_prompt
+
+        selected = set(rank_tools(self.tools_summary, text, self.top_k))
+        tools = [
+            tool
+            for tool in self.tools
+            if tool.get("function", tool)["name"] in selected
+        ]
+        summary = [tool for tool in self.tools_summary if tool["name"] in selected]
+        return tools, render_tool_catalog(summary, self.description_chars)
+
+    @staticmethod
+    def _build_tools_summary(tools: list) -> list[dict]:
         summary = []
-        for tool in self.tools:
+        for tool in tools:
             func = tool.get("function", tool)
             summary.append(
                 {
@@ -73,94 +138,137 @@ class ToolManager:
         return summary
 
     async def _get_mcp_tools(self):
-        """从 MCP 服务中加载工具"""
+        """从 MCP 服务中加载工具（优先命中进程级工具目录缓存）"""
         self.tool_mcp_server_dict = {}
-        servers_config = []
         enabled_tools = set()
 
-        all_servers = await MCPService.get_all_servers(self.user_id)
-        mcp_servers = [
-            server["mcp_server_id"] for server in all_servers if server.get("is_active")
-        ]
+        # 单次查询取回全部已启用服务及其工具白名单
+        server_configs = await MCPService.get_active_server_configs(self.user_id)
 
-        mcp_configs: dict[str, MCPConfig] = {}
-        for mcp_id in mcp_servers:
-            mcp_server = await MCPService.get_mcp_server_from_id(mcp_id)
-            mcp_config = MCPConfig(**mcp_server)
-            mcp_configs[mcp_id] = mcp_config
+        mcp_configs: list[MCPConfig] = []
+        for server_config in server_configs:
+            mcp_config = MCPConfig(**server_config)
+            mcp_configs.append(mcp_config)
+            enabled_tools.update(mcp_config.tools)
 
-            if mcp_config.tools:
-                enabled_tools.update(mcp_config.tools)
-                self.tool_mcp_server_dict.update(
-                    {tool: mcp_config.mcp_server_id for tool in mcp_config.tools}
-                )
-            servers_config.append(convert_mcp_config(mcp_config.model_dump()))
+        async def _load_server_tools(mcp_config: MCPConfig):
+            # 存在工具白名单时按服务端各自的白名单过滤，否则加载全部工具
+            if enabled_tools and not mcp_config.tools:
+                return []
+            sse_config = convert_mcp_config(mcp_config.model_dump())
+            connection = sse_config.model_dump(
+                exclude={"server_name", "personal_config"}
+            )
+            return await mcp_tool_catalog.get_tools(
+                connection,
+                enabled_tools=mcp_config.tools if enabled_tools else None,
+                server_id=mcp_config.mcp_server_id,
+            )
 
-        self.mcp_manager = MCPManager(servers_config)
-        all_mcp_tools = await self.mcp_manager.get_mcp_tools()
+        servers_tools = await asyncio.gather(
+            *[_load_server_tools(mcp_config) for mcp_config in mcp_configs]
+        )
 
-        if enabled_tools:
-            filtered_tools = [
-                tool for tool in all_mcp_tools if tool.name in enabled_tools
-            ]
-        else:
-            filtered_tools = all_mcp_tools
-            for mcp_id, mcp_config in mcp_configs.items():
-                for tool in filtered_tools:
-                    self.tool_mcp_server_dict.setdefault(
-                        tool.name, mcp_config.mcp_server_id
-                    )
+        filtered_tools = []
+        for mcp_config, server_tools in zip(mcp_configs, servers_tools):
+            for tool in server_tools:
+                filtered_tools.append(tool)
+                self.tool_mcp_server_dict.setdefault(
+                    tool.name, mcp_config.mcp_server_id
+                )
 
         self.mcp_tools = filtered_tools
         return filtered_tools
 
-    async def process_tool_result(self, tool_name: str, tool_args: dict) -> str:
-        """调用工具并统一返回文本结果"""
-
-        def find_mcp_tool(name):
-            for tool in self.mcp_tools:
-                if tool.name == name:
-                    return tool
-            return None
-
-        if tool := find_mcp_tool(tool_name):
-            try:
-                text_content, no_text_content = await tool.coroutine(**tool_args)
-            except ToolException as e:
-                text_content = f"[工具执行失败] {tool_name}: {e}"
-            except Exception as e:
-                text_content = f"[工具执行失败] {tool_name}: {type(e).__name__} - {e}"
-        else:
-            if tool_name == "web_search":
-                from toolmind.api.services.web_search import _web_search
+    def _find_mcp_tool(self, tool_name: str):
+        for tool in self.mcp_tools:
+            if tool.name == tool_name:
+                return tool
+        return None
 
-                await self._ensure_web_search_config()
-                text_content = _web_search(
-                    **tool_args, api_key=self._web_search_api_key
-                )
-            else:
-                text_content = f"[工具执行失败] 未知内置工具 {tool_name}"
+    def _is_cacheable(self, tool_name: str) -> bool:
+        """只读或幂等的工具才在单次运行内去重：MCP 工具依据 annotations，内置搜索默认开启"""
+        if tool := self._find_mcp_tool(tool_name):
+            annotations = tool.metadata or {}
+            return bool(
+                annotations.get("readOnlyHint") or annotations.get("idempotentHint")
+            )
+        return tool_name == "web_search"
 
-        return text_content
+    def _is_persistent(self, tool_name: str) -> bool:
+        """只有只读工具与内置搜索的结果写入 Redis 跨运行复用，幂等工具可能改变外部状态"""
+        if tool := self._find_mcp_tool(tool_name):
+            return bool((tool.metadata or {}).get("readOnlyHint"))
+        return tool_name == "web_search"
+
+    async def _call_tool(self, tool_name: str, tool_args: dict) -> str:
+        """实际调用工具，失败时抛出异常"""
+        if tool := self._find_mcp_tool(tool_name):
+            text_content, no_text_content = await tool.coroutine(**tool_args)
+            return text_content
+
+        if tool_name == "web_search":
+            # 复用运行开始时解析的 Web 搜索配置，不再逐次查询数据库
+            return await web_search_client.search(
+                **tool_args, api_key=self._web_search_api_key
+            )
+
+        raise LookupError(f"未知内置工具 {tool_name}")
+
+    async def _execute_tool(
+        self, tool_name: str, tool_args: dict
+    ) -> Tuple[str, bool]:
+        """经缓存与执行器调用工具，返回 (文本结果, 是否成功)"""
+        # 同一 MCP 服务的工具共享并发名额，内置工具按工具名区分
+        server_key = self.tool_mcp_server_dict.get(tool_name, tool_name)
+        try:
+            content = await self.result_cache.get_or_call(
+                tool_name,
+                tool_args,
+                lambda: self.tool_executor.run(
+                    tool_name,
+                    server_key,
+                    lambda: self._call_tool(tool_name, tool_args),
+                ),
+                server=server_key,
+                cacheable=self._is_cacheable(tool_name),
+                persistent=self._is_persistent(tool_name),
+            )
+            return content, True
+        except (ToolException, ToolTimeoutError) as e:
+            return f"[工具执行失败] {tool_name}: {e}", False
+        except LookupError as e:
+            return f"[工具执行失败] {e}", False
+        except Exception as e:
+            return f"[工具执行失败] {tool_name}: {type(e).__name__} - {e}", False
+
+    async def process_tool_result(self, tool_name: str, tool_args: dict) -> str:
+        """调用工具并统一返回文本结果，相同工具与参数的重复调用命中缓存"""
+        content, _ = await self._execute_tool(tool_name, tool_args)
+        return content
 
     async def parse_function_call_response(
         self, message: AIMessage
     ) -> List[ToolMessage]:
-        """并行执行模型返回的所有 tool_calls"""
+        """并行执行模型返回的所有 tool_calls，失败或超时的调用返回 status=error"""
         if not message.tool_calls:
             return []
 
-        # 并发执行所有工具调用
         async def _run_one(tool_call: dict) -> ToolMessage:
             tool_name = tool_call.get("name")
             tool_args = tool_call.get("args")
-            tool_call_id = tool_call.get("id")
-            content = await self.process_tool_result(tool_name, tool_args)
+            content, ok = await self._execute_tool(tool_name, tool_args)
             return ToolMessage(
-                content=content, name=tool_name, tool_call_id=tool_call_id
+                content=content,
+                name=tool_name,
+                tool_call_id=tool_call.get("id"),
+                status="success" if ok else "error",
             )
 
-        tool_messages = await asyncio.gather(
-            *[_run_one(tc) for tc in message.tool_calls]
-        )
-        return list(tool_messages)
+        # 请求中止时 TaskGroup 会取消尚未完成的兄弟调用
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [
+                task_group.create_task(_run_one(tool_call))
+                for tool_call in message.tool_calls
+            ]
+        return [task.result() for task in tasks]
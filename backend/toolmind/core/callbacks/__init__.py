@@ -1,3 +1,4 @@
 from toolmind.core.callbacks.usage_metadata import UsageMetadataCallback
+from toolmind.core.callbacks.usage_writer import UsageStatsWriter, usage_stats_writer
 
-__all__ = ["UsageMetadataCallback"]
+__all__ = ["UsageMetadataCallback", "UsageStatsWriter", "usage_stats_writer"]
@@ -6,7 +6,7 @@ from langchain_core.messages import AIMessage
 from langchain_core.messages.ai import UsageMetadata, add_usage
 from langchain_core.outputs import ChatGeneration, LLMResult
 from loguru import logger
-from toolmind.api.services import UsageStatsService
+from toolmind.core.callbacks.usage_writer import usage_stats_writer
 from toolmind.utils import get_user_id_context
 from typing_extensions import override
 
@@ -16,6 +16,9 @@ class UsageMetadataCallback(BaseCallbackHandler):
     Callback Handler that tracks AIMessage.usage_metadata.
     """
 
+    # 只做内存操作与入队，直接在事件循环线程中执行，无需线程池
+    run_inline = True
+
     def __init__(self) -> None:
         """Initialize the UsageMetadataCallbackHandler."""
         super().__init__()
@@ -59,15 +62,23 @@ class UsageMetadataCallback(BaseCallbackHandler):
 
     def record_token_usage(self, model_name, usage_metadata):
         user_id = get_user_id_context()
+        if not user_id:
+            # user_id 为必填列，缺失的记录会导致整批写入失败
+            logger.warning(f"Skip usage stats of {model_name}: missing user id")
+            return
 
+        # 命中服务商提示词缓存的输入 token（OpenAI 兼容接口的 cached_tokens）
+        input_details = usage_metadata.get("input_token_details") or {}
         record = {
             "model": model_name,
             "user_id": user_id,
             "input_tokens": usage_metadata.get("input_tokens", 0),
             "output_tokens": usage_metadata.get("output_tokens", 0),
+            "cached_tokens": input_details.get("cache_read") or 0,
         }
         logger.info(
-            f"{model_name} cost input tokens: {usage_metadata.get("input_tokens")}, output tokens: {usage_metadata.get("output_tokens")}"
+            f"{model_name} cost input tokens: {record["input_tokens"]} "
+            f"(cached {record["cached_tokens"]}), output tokens: {record["output_tokens"]}"
         )
 
-        UsageStatsService.sync_create_usage_stats(**record)
+        usage_stats_writer.submit(record)
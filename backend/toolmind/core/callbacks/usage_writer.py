@@ -0,0 +1,140 @@
+"""
+Token 使用记录的后台写入：有界队列缓冲，按批次写入数据库
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from toolmind.api.services import UsageStatsService
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL_MS = 500
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_MAX_RETRIES = 3
+# 队列满时丢弃记录的告警间隔，避免刷屏
+DROP_WARNING_INTERVAL = 10
+
+# 停止信号：写入器处理完它之前的记录后退出
+_STOP = object()
+
+
+class UsageStatsWriter:
+    """
+    Token 使用记录的后台批量写入器。
+
+    回调只负责把记录放入有界队列，后台任务每攒满 N 条或每隔 T 毫秒执行一次多行 INSERT；
+    数据库变慢时队列被占满，新记录直接丢弃并告警，LLM 调用路径不会等待 MySQL。
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dropped = 0
+        self._last_drop_warning = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """在应用事件循环中启动后台写入任务"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, record: dict) -> None:
+        """提交一条使用记录，可在任意线程调用，从不阻塞"""
+        if not self.running:
+            # 未启动（如脚本环境）时退化为同步写入
+            UsageStatsService.sync_create_usage_stats(**record)
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            self._put(record)
+        else:
+            self._loop.call_soon_threadsafe(self._put, record)
+
+    def _put(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            now = time.monotonic()
+            if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+                self._last_drop_warning = now
+                logger.warning(
+                    f"Usage stats queue is full, dropped {self._dropped} records so far"
+                )
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect_batch(self) -> Tuple[List[dict], bool]:
+        """等待第一条记录，然后在刷新间隔内尽量攒满一批；返回 (批次, 是否收到停止信号)"""
+        record = await self._queue.get()
+        if record is _STOP:
+            return [], True
+
+        batch = [record]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                record = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if record is _STOP:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    async def _flush(self, batch: List[dict]) -> None:
+        for attempt in range(self.max_retries):
+            try:
+                await UsageStatsService.batch_create_usage_stats(batch)
+                return
+            except Exception as err:
+                logger.warning(
+                    f"Write usage stats failed ({attempt + 1}/{self.max_retries}): {err}"
+                )
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(0.5 * 2**attempt)
+        logger.error(f"Discard {len(batch)} usage stats records after retries")
+
+    async def stop(self) -> None:
+        """写完队列中剩余的记录后停止后台任务（应用退出时调用）"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+
+usage_stats_writer = UsageStatsWriter()
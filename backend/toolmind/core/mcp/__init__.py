@@ -1,4 +1,13 @@
+from toolmind.core.mcp.catalog import MCPToolCatalog, mcp_tool_catalog
 from toolmind.core.mcp.manager import MCPManager
 from toolmind.core.mcp.multi_client import MultiServerMCPClient
+from toolmind.core.mcp.pool import MCPSessionPool, mcp_session_pool
 
-__all__ = ["MCPManager", "MultiServerMCPClient"]
+__all__ = [
+    "MCPManager",
+    "MCPSessionPool",
+    "MCPToolCatalog",
+    "MultiServerMCPClient",
+    "mcp_session_pool",
+    "mcp_tool_catalog",
+]
@@ -0,0 +1,120 @@
+"""进程级 MCP 工具目录缓存：避免每个 Agent 节点重复 list_tools"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from langchain_core.tools import BaseTool
+from mcp.types import ServerNotification, ToolListChangedNotification
+from toolmind.core.mcp.pool import connection_key, mcp_session_pool
+from toolmind.core.mcp.sessions import Connection
+from toolmind.core.mcp.tools import load_mcp_tools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_TTL = 60 * 5
+
+InvalidateListener = Callable[[str], None]
+
+
+@dataclass
+class _CatalogEntry:
+    tools: list[BaseTool]
+    expires_at: float
+    connection_key: str
+    # 同一连接配置可能被多个 MCP Server 记录共享
+    server_ids: set[str] = field(default_factory=set)
+
+
+class MCPToolCatalog:
+    """按 (url, headers 哈希, 启用工具集合) 缓存 MCP 工具列表，带 TTL 与主动失效"""
+
+    def __init__(self, ttl: float = DEFAULT_CATALOG_TTL):
+        self.ttl = ttl
+        # key: (connection_key, 启用工具集合)，None 表示不过滤
+        self._entries: dict[tuple, _CatalogEntry] = {}
+        self._locks: dict[tuple, asyncio.Lock] = {}
+        self._invalidate_listeners: list[InvalidateListener] = []
+
+    def add_invalidate_listener(self, listener: InvalidateListener) -> None:
+        """注册 MCP Server 失效回调（如清除该服务的工具结果缓存）"""
+        self._invalidate_listeners.append(listener)
+
+    async def get_tools(
+        self,
+        connection: Connection,
+        enabled_tools: list[str] | None = None,
+        server_id: str | None = None,
+    ) -> list[BaseTool]:
+        """获取服务端工具列表，缓存命中时不访问 MCP 服务"""
+        conn_key = connection_key(connection)
+        enabled = frozenset(enabled_tools) if enabled_tools else None
+        key = (conn_key, enabled)
+
+        entry = self._entries.get(key)
+        if entry and entry.expires_at > time.monotonic():
+            if server_id:
+                entry.server_ids.add(server_id)
+            return entry.tools
+
+        # 同一个 key 只允许一个协程去拉取，其余等待结果
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > time.monotonic():
+                if server_id:
+                    entry.server_ids.add(server_id)
+                return entry.tools
+
+            tools = await load_mcp_tools(None, connection=connection)
+            if enabled is not None:
+                tools = [tool for tool in tools if tool.name in enabled]
+
+            self._entries[key] = _CatalogEntry(
+                tools=tools,
+                expires_at=time.monotonic() + self.ttl,
+                connection_key=conn_key,
+                server_ids={server_id} if server_id else set(),
+            )
+            return tools
+
+    def invalidate(self, server_id: str) -> None:
+        """MCP Server 配置变更或删除时，清除其全部缓存"""
+        self._drop(lambda entry: server_id in entry.server_ids)
+        for listener in self._invalidate_listeners:
+            try:
+                listener(server_id)
+            except Exception as err:
+                logger.warning(f"MCP invalidate listener failed: {err}")
+
+    def invalidate_connection(self, conn_key: str) -> None:
+        """服务端通知工具列表变化时，清除该连接的全部缓存"""
+        self._drop(lambda entry: entry.connection_key == conn_key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._locks.clear()
+
+    def _drop(self, predicate) -> None:
+        for key, entry in list(self._entries.items()):
+            if predicate(entry):
+                self._entries.pop(key, None)
+                self._locks.pop(key, None)
+
+    async def handle_notification(self, conn_key: str, message) -> None:
+        """处理会话池转发的服务端消息，识别 tools/list_changed"""
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, ToolListChangedNotification
+        ):
+            logger.info(f"MCP tools list changed, invalidate catalog: {conn_key}")
+            self.invalidate_connection(conn_key)
+
+
+mcp_tool_catalog = MCPToolCatalog()
+mcp_session_pool.add_message_listener(mcp_tool_catalog.handle_notification)
+
+__all__ = ["MCPToolCatalog", "mcp_tool_catalog"]
@@ -65,10 +65,14 @@ class MCPManager:
             tool = tool_dict[tool_name]
             try:
                 if asyncio.iscoroutinefunction(tool.coroutine):
-                    result = await tool.coroutine(**args)
+                    call = tool.coroutine(**args)
                 else:
-                    result = await asyncio.to_thread(tool.coroutine, **args)
-                return result
+                    call = asyncio.to_thread(tool.coroutine, **args)
+                return await asyncio.wait_for(call, self.timeout)
+            except asyncio.TimeoutError:
+                message = f"Tool {tool_name} timed out after {self.timeout}s"
+                logger.error(message)
+                return f"Error executing tool {tool_name}: {message}"
             except Exception as e:
                 logger.error(f"Error executing tool: {e}")
                 return f"Error executing tool {tool_name}: {e}"
@@ -42,7 +42,7 @@ class MultiServerMCPClient:
             yield session
 
     async def get_tools(self, *, server_name: str | None = None) -> list[BaseTool]:
-        """从所有或指定的连接中获取工具列表（每个工具调用都会创建新会话）"""
+        """从所有或指定的连接中获取工具列表（工具调用复用会话池中的常驻会话）"""
         if server_name is not None:
             if server_name not in self.connections:
                 msg = (
@@ -0,0 +1,282 @@
+"""MCP 会话池：按服务端复用长连接，避免每次工具调用都重新握手"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import anyio
+import httpx
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+from toolmind.core.mcp.sessions import Connection, create_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_SESSIONS_PER_SERVER = 4
+DEFAULT_IDLE_TIMEOUT = 60 * 5
+DEFAULT_KEEPALIVE_INTERVAL = 30
+DEFAULT_PING_TIMEOUT = 5
+DEFAULT_CLOSE_TIMEOUT = 5
+
+
+def connection_key(connection: Connection) -> str:
+    """根据 url 与 headers 生成服务端的唯一标识"""
+    headers = json.dumps(connection.get("headers") or {}, sort_keys=True, default=str)
+    headers_hash = hashlib.md5(headers.encode("utf-8")).hexdigest()
+    return f"{connection.get('url')}#{headers_hash}"
+
+
+MessageListener = Callable[[str, Any], Awaitable[None]]
+
+# 复用的会话已断开时发送请求会抛出的传输层异常
+_CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+
+def _is_connection_error(err: Exception) -> bool:
+    """仅连接失效类错误可以换新会话重试，工具本身的错误不能重放"""
+    if isinstance(err, McpError):
+        return err.error.code == CONNECTION_CLOSED
+    return isinstance(err, _CONNECTION_ERRORS)
+
+
+class _PooledSession:
+    """单个常驻会话：在独立任务中持有 SSE 连接，保证上下文在同一任务内进出"""
+
+    def __init__(
+        self, connection: Connection, listeners: list[MessageListener] | None = None
+    ):
+        self.connection = connection
+        self.listeners = listeners or []
+        self.session: ClientSession | None = None
+        self.last_used = time.monotonic()
+        self.reused = False
+        self._ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def open(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        await self._ready
+
+    async def _handle_message(self, message) -> None:
+        """将服务端推送的通知（如 tools/list_changed）转发给监听者"""
+        conn_key = connection_key(self.connection)
+        for listener in self.listeners:
+            try:
+                await listener(conn_key, message)
+            except Exception as err:
+                logger.info(f"MCP message listener error: {err}")
+
+    async def _run(self) -> None:
+        session_kwargs = {
+            **(self.connection.get("session_kwargs") or {}),
+            "message_handler": self._handle_message,
+        }
+        connection = {**self.connection, "session_kwargs": session_kwargs}
+        try:
+            async with create_session(connection) as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set_result(None)
+                await self._closing.wait()
+        except BaseException as err:
+            if not self._ready.done():
+                self._ready.set_exception(err)
+            elif not isinstance(err, asyncio.CancelledError):
+                logger.info(f"MCP session closed unexpectedly: {err}")
+        finally:
+            self.session = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and not self._closing.is_set()
+        )
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception as err:
+            logger.info(f"MCP session ping failed: {err}")
+            return False
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is None or self._task.done():
+            return
+        done, _ = await asyncio.wait([self._task], timeout=DEFAULT_CLOSE_TIMEOUT)
+        if not done:
+            self._task.cancel()
+
+
+class _ServerSessions:
+    """单个服务端的会话集合"""
+
+    def __init__(self, connection: Connection, max_sessions: int):
+        self.connection = connection
+        self.semaphore = asyncio.Semaphore(max_sessions)
+        self.idle: list[_PooledSession] = []
+        self.in_use = 0
+
+
+class MCPSessionPool:
+    """按服务端维护常驻 MCP 会话，支持并发上限、保活、空闲回收与断线重连"""
+
+    def __init__(
+        self,
+        max_sessions_per_server: int = DEFAULT_MAX_SESSIONS_PER_SERVER,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
+    ):
+        self.max_sessions_per_server = max_sessions_per_server
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self._servers: dict[str, _ServerSessions] = {}
+        self._keepalive_task: asyncio.Task | None = None
+        self._listeners: list[MessageListener] = []
+
+    def add_message_listener(self, listener: MessageListener) -> None:
+        """注册服务端消息监听者，参数为 (connection_key, message)"""
+        self._listeners.append(listener)
+
+    def _get_server(self, connection: Connection) -> _ServerSessions:
+        key = connection_key(connection)
+        if key not in self._servers:
+            self._servers[key] = _ServerSessions(
+                connection, self.max_sessions_per_server
+            )
+        return self._servers[key]
+
+    def _ensure_keepalive(self) -> None:
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    @asynccontextmanager
+    async def session(self, connection: Connection) -> AsyncIterator[ClientSession]:
+        """从池中借出一个已初始化的会话，使用完毕后归还"""
+        async with self._checkout(connection) as pooled:
+            yield pooled.session
+
+    @asynccontextmanager
+    async def _checkout(self, connection: Connection) -> AsyncIterator[_PooledSession]:
+        self._ensure_keepalive()
+        server = self._get_server(connection)
+
+        server.in_use += 1
+        try:
+            async with server.semaphore:
+                pooled = await self._take_idle(server)
+                if pooled is None:
+                    pooled = _PooledSession(connection, self._listeners)
+                    await pooled.open()
+
+                try:
+                    yield pooled
+                except BaseException:
+                    # 出错的会话状态不可信，直接丢弃
+                    await pooled.close()
+                    raise
+
+                pooled.last_used = time.monotonic()
+                pooled.reused = True
+                if pooled.alive:
+                    server.idle.append(pooled)
+        finally:
+            server.in_use -= 1
+
+    @staticmethod
+    async def _take_idle(server: _ServerSessions) -> _PooledSession | None:
+        while server.idle:
+            candidate = server.idle.pop()
+            if candidate.alive:
+                return candidate
+            await candidate.close()
+        return None
+
+    async def run(
+        self,
+        connection: Connection,
+        operation: Callable[[ClientSession], Awaitable[T]],
+    ) -> T:
+        """
+        在池化会话上执行操作；复用的会话若已断开，则换新会话重试一次。
+
+        只有连接失效类错误才重试，工具执行失败等其他错误直接抛出，避免非幂等工具被执行两次。
+        """
+        for attempt in range(2):
+            reused = False
+            try:
+                async with self._checkout(connection) as pooled:
+                    reused = pooled.reused
+                    return await operation(pooled.session)
+            except Exception as err:
+                if attempt or not reused or not _is_connection_error(err):
+                    raise
+                logger.info(f"MCP session dropped, reconnecting: {err}")
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self._sweep()
+            except Exception as err:
+                logger.info(f"MCP session keepalive error: {err}")
+
+    async def _sweep(self) -> None:
+        """回收空闲过久的会话，并对其余空闲会话发送 ping 保活"""
+        now = time.monotonic()
+        for key, server in list(self._servers.items()):
+            idle, server.idle = server.idle, []
+            for pooled in idle:
+                if now - pooled.last_used > self.idle_timeout:
+                    await pooled.close()
+                elif await pooled.ping(DEFAULT_PING_TIMEOUT):
+                    server.idle.append(pooled)
+                else:
+                    await pooled.close()
+
+            # 保活期间可能有新会话归还，超出上限的部分直接关闭
+            while len(server.idle) > self.max_sessions_per_server:
+                await server.idle.pop(0).close()
+
+            if not server.idle and not server.in_use:
+                self._servers.pop(key, None)
+
+    async def close(self) -> None:
+        """关闭全部会话（应用退出时调用）"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+
+        servers, self._servers = self._servers, {}
+        for server in servers.values():
+            idle, server.idle = server.idle, []
+            for pooled in idle:
+                await pooled.close()
+
+
+mcp_session_pool = MCPSessionPool()
+
+__all__ = ["MCPSessionPool", "connection_key", "mcp_session_pool"]
@@ -6,7 +6,8 @@ from langchain_core.tools import BaseTool, StructuredTool, ToolException
 from mcp import ClientSession
 from mcp.types import CallToolResult, EmbeddedResource, ImageContent, TextContent
 from mcp.types import Tool as MCPTool
-from toolmind.core.mcp.sessions import Connection, create_session
+from toolmind.core.mcp.pool import mcp_session_pool
+from toolmind.core.mcp.sessions import Connection
 
 NonTextContent = ImageContent | EmbeddedResource
 MAX_ITERATIONS = 1000
@@ -76,13 +77,14 @@ def _convert_mcp_tool_to_langchain_tool(
         **arguments: dict[str, Any],
     ) -> tuple[str | list[str], list[NonTextContent] | None]:
         if session is None:
-            # If a session is not provided, we will create one on the fly
-            async with create_session(connection) as tool_session:
-                await tool_session.initialize()
-                call_tool_result = await cast("ClientSession", tool_session).call_tool(
+            # If a session is not provided, we will check one out of the pool
+            call_tool_result = await mcp_session_pool.run(
+                connection,
+                lambda tool_session: cast("ClientSession", tool_session).call_tool(
                     tool.name,
                     arguments,
-                )
+                ),
+            )
         else:
             call_tool_result = await session.call_tool(tool.name, arguments)
         return _convert_call_tool_result(call_tool_result)
@@ -108,10 +110,8 @@ async def load_mcp_tools(
         raise ValueError(msg)
 
     if session is None:
-        # If a session is not provided, we will create one on the fly
-        async with create_session(connection) as tool_session:
-            await tool_session.initialize()
-            tools = await _list_all_tools(tool_session)
+        # If a session is not provided, we will check one out of the pool
+        tools = await mcp_session_pool.run(connection, _list_all_tools)
     else:
         tools = await _list_all_tools(session)
 
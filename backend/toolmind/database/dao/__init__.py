@@ -3,6 +3,7 @@ from toolmind.database.dao.llm import LLMDao
 from toolmind.database.dao.mcp_server import MCPServerDao
 from toolmind.database.dao.role import RoleDao
 from toolmind.database.dao.session import Session, SessionDao
+from toolmind.database.dao.session_turn import SessionTurnDao
 from toolmind.database.dao.usage_stats import UsageStats, UsageStatsDao
 from toolmind.database.dao.user import UserDao
 from toolmind.database.dao.user_role import UserRoleDao
@@ -15,6 +16,7 @@ __all__ = [
     "RoleDao",
     "Session",
     "SessionDao",
+    "SessionTurnDao",
     "UsageStats",
     "UsageStatsDao",
     "UserDao",
@@ -1,6 +1,6 @@
 from sqlmodel import and_, delete, select, update
 from toolmind.database.models import LLMTable
-from toolmind.database.session import session_getter
+from toolmind.database.session import async_session_getter
 
 
 class LLMDao:
@@ -22,7 +22,7 @@ class LLMDao:
     async def create_llm(
         cls, model: str, base_url: str, api_key: str, provider: str, user_id: str
     ):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             llm = await cls._create_llm(
                 model=model,
                 base_url=base_url,
@@ -31,20 +31,20 @@ class LLMDao:
                 user_id=user_id,
             )
             session.add(llm)
-            session.commit()
+            await session.commit()
 
     @classmethod
     async def delete_llm(cls, llm_id: str):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = delete(LLMTable).where(LLMTable.llm_id == llm_id)
-            session.exec(sql)
-            session.commit()
+            await session.exec(sql)
+            await session.commit()
 
     @classmethod
     async def update_llm(
         cls, llm_id: str, base_url: str, model: str, api_key: str, provider: str
     ):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             update_values = {}
             if base_url:
                 update_values["base_url"] = base_url
@@ -60,42 +60,42 @@ class LLMDao:
                 .where(LLMTable.llm_id == llm_id)
                 .values(**update_values)
             )
-            session.exec(sql)
-            session.commit()
+            await session.exec(sql)
+            await session.commit()
 
     @classmethod
     async def get_llm_by_user(cls, user_id: str):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(LLMTable).where(LLMTable.user_id == user_id)
-            result = session.exec(sql).all()
+            result = (await session.exec(sql)).all()
             return result
 
     @classmethod
     async def get_llm_by_id(cls, llm_id: str):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(LLMTable).where(LLMTable.llm_id == llm_id)
-            result = session.exec(sql).first()
+            result = (await session.exec(sql)).first()
             return result
 
     @classmethod
     async def get_all_llm(cls):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(LLMTable)
-            result = session.exec(sql).all()
+            result = (await session.exec(sql)).all()
             return result
 
     @classmethod
     async def get_user_id_by_llm(cls, llm_id: str):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(LLMTable).where(LLMTable.llm_id == llm_id)
-            llm = session.exec(sql).first()
+            llm = (await session.exec(sql)).first()
             return llm
 
     @classmethod
     async def get_llm_id_from_name(cls, llm_name, user_id):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(LLMTable).where(
                 and_(LLMTable.model == llm_name, LLMTable.user_id == user_id)
             )
-            result = session.exec(sql)
+            result = await session.exec(sql)
             return result.first()
@@ -1,6 +1,6 @@
 from sqlmodel import and_, delete, func, select, update
 from toolmind.database.models import MCPServerTable
-from toolmind.database.session import session_getter
+from toolmind.database.session import async_session_getter
 
 
 class MCPServerDao:
@@ -16,7 +16,7 @@ class MCPServerDao:
         params: dict,
         is_active: bool,
     ):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             mcp_server = MCPServerTable(
                 server_name=server_name,
                 user_id=user_id,
@@ -28,25 +28,25 @@ class MCPServerDao:
                 is_active=is_active,
             )
             session.add(mcp_server)
-            session.commit()
+            await session.commit()
 
     @classmethod
     async def get_mcp_server_from_id(cls, mcp_server_id):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(MCPServerTable).where(
                 MCPServerTable.mcp_server_id == mcp_server_id
             )
-            results = session.exec(sql).first()
+            results = (await session.exec(sql)).first()
             return results
 
     @classmethod
     async def delete_mcp_server(cls, mcp_server_id):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = delete(MCPServerTable).where(
                 MCPServerTable.mcp_server_id == mcp_server_id
             )
-            session.exec(sql)
-            session.commit()
+            await session.exec(sql)
+            await session.commit()
 
     @classmethod
     async def update_mcp_server(
@@ -60,7 +60,7 @@ class MCPServerDao:
         params: dict = None,
         is_active: bool = None,
     ):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             update_values = {}
             if server_name:
                 update_values["server_name"] = server_name
@@ -83,41 +83,60 @@ class MCPServerDao:
                 .where(MCPServerTable.mcp_server_id == mcp_server_id)
                 .values(**update_values)
             )
-            session.exec(sql)
-            session.commit()
+            await session.exec(sql)
+            await session.commit()
 
     # 检查更新时间是否超过7天
     @classmethod
     async def get_first_mcp_server(cls):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             statement = select(MCPServerTable)
-            server = session.exec(statement).first()
+            server = (await session.exec(statement)).first()
             return server
 
     @classmethod
     async def get_server_from_tool_name(cls, tool_name):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(MCPServerTable).where(
                 func.json_contains(MCPServerTable.tools, func.json_array(tool_name))
             )
-            results = session.exec(sql).first()
+            results = (await session.exec(sql)).first()
             return results
 
     @classmethod
     async def get_mcp_servers_from_user(cls, user_id):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(MCPServerTable).where(MCPServerTable.user_id == user_id)
-            results = session.exec(sql)
+            results = await session.exec(sql)
             return results.all()
 
+    @classmethod
+    async def get_active_mcp_server_configs(cls, user_id):
+        """一次查询取出用户已启用服务的连接配置与工具白名单（不加载 params）"""
+        async with async_session_getter() as session:
+            sql = select(
+                MCPServerTable.mcp_server_id,
+                MCPServerTable.server_name,
+                MCPServerTable.url,
+                MCPServerTable.type,
+                MCPServerTable.tools,
+            ).where(
+                and_(
+                    MCPServerTable.user_id == user_id,
+                    MCPServerTable.is_active == True,
+                )
+            )
+            results = await session.exec(sql)
+            return [row._asdict() for row in results.all()]
+
     @classmethod
     async def get_mcp_server_ids_from_name(cls, mcp_servers_name, user_id):
-        with session_getter() as session:
+        async with async_session_getter() as session:
             sql = select(MCPServerTable).where(
                 and_(
                     MCPServerTable.server_name.in_(mcp_servers_name),
                     MCPServerTable.user_id == user_id,
                 )
             )
-            result = session.exec(sql)
+            result = await session.exec(sql)
             return result.all()
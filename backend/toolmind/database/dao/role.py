@@ -2,13 +2,13 @@ from typing import List
 
 from sqlmodel import and_, delete, func, select
 from toolmind.database.models import AdminRole, Role, RoleBase, RoleCreate
-from toolmind.database.session import session_getter
+from toolmind.database.session import async_session_getter
 
 
 class RoleDao:
 
     @classmethod
-    def get_role_by_groups(
+    async def get_role_by_groups(
         cls, group: List[int], keyword: str = None, page: int = 0, limit: int = 0
     ) -> List[Role]:
         """
@@ -27,11 +27,12 @@ class RoleDao:
         if page and limit:
             statement = statement.offset((page - 1) * limit).limit(limit)
         statement = statement.order_by(Role.create_time.desc())
-        with session_getter() as session:
-            return session.exec(statement).all()
+        async with async_session_getter() as session:
+            result = await session.exec(statement)
+            return result.all()
 
     @classmethod
-    def count_role_by_groups(cls, group: List[int], keyword: str = None) -> int:
+    async def count_role_by_groups(cls, group: List[int], keyword: str = None) -> int:
         """
         统计用户组内的角色数量，参数如上
         """
@@ -40,35 +41,37 @@ class RoleDao:
             statement = statement.where(Role.group_id.in_(group))
         if keyword:
             statement = statement.filter(Role.role_name.like(f"%{keyword}%"))
-        with session_getter() as session:
-            return session.scalar(statement)
+        async with async_session_getter() as session:
+            return await session.scalar(statement)
 
     @classmethod
-    def insert_role(cls, role: RoleCreate):
-        with session_getter() as session:
+    async def insert_role(cls, role: RoleCreate):
+        async with async_session_getter() as session:
             session.add(role)
-            session.commit()
-            session.refresh(role)
+            await session.commit()
+            await session.refresh(role)
             return role
 
     @classmethod
-    def get_role_by_ids(cls, role_ids: List[int]) -> List[Role]:
-        with session_getter() as session:
-            return session.query(Role).filter(Role.id.in_(role_ids)).all()
+    async def get_role_by_ids(cls, role_ids: List[int]) -> List[Role]:
+        async with async_session_getter() as session:
+            result = await session.exec(select(Role).where(Role.id.in_(role_ids)))
+            return result.all()
 
     @classmethod
-    def get_role_by_id(cls, role_id: int) -> Role:
-        with session_getter() as session:
-            return session.query(Role).filter(Role.id == role_id).first()
+    async def get_role_by_id(cls, role_id: int) -> Role:
+        async with async_session_getter() as session:
+            result = await session.exec(select(Role).where(Role.id == role_id))
+            return result.first()
 
     @classmethod
-    def delete_role_by_group_id(cls, group_id: int):
+    async def delete_role_by_group_id(cls, group_id: int):
         """
         删除分组下所有的角色，清理用户对应的角色
         """
         from toolmind.database.models.user_role import UserRole
 
-        with session_getter() as session:
+        async with async_session_getter() as session:
             # 清理对应的用户
             all_user = (
                 select(UserRole, Role)
@@ -77,9 +80,9 @@ class RoleDao:
                 )
                 .group_by(UserRole.id)
             )
-            all_user = session.exec(all_user).all()
-            session.exec(
+            all_user = (await session.exec(all_user)).all()
+            await session.exec(
                 delete(UserRole).where(UserRole.id.in_([one.id for one in all_user]))
             )
-            session.exec(delete(Role).where(Role.group_id == group_id))
-            session.commit()
+            await session.exec(delete(Role).where(Role.group_id == group_id))
+            await session.commit()
@@ -1,15 +1,54 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from sqlmodel import and_, delete, select
-from toolmind.database.models import Session
+from sqlalchemy import false
+from sqlmodel import and_, delete, or_, select
+from toolmind.database.models import Session, SessionTurn
 from toolmind.database.session import async_session_getter
 
 
 class SessionDao:
     @classmethod
-    async def get_sessions(cls, user_id):
+    async def get_session_page(
+        cls,
+        user_id: str,
+        limit: int,
+        after: Optional[Tuple[bool, datetime, str]] = None,
+    ):
+        """
+        按 (置顶, 修改时间, 会话 ID) 倒序取一页会话，只查询列表展示需要的列。
+
+        after 为上一页最后一条的排序键，按键集分页，翻页开销与偏移量无关。
+        """
         async with async_session_getter() as session:
-            statement = select(Session).where(Session.user_id == user_id)
+            statement = select(
+                Session.session_id,
+                Session.title,
+                Session.is_pinned,
+                Session.create_time,
+                Session.update_time,
+            ).where(Session.user_id == user_id)
+            if after is not None:
+                is_pinned, update_time, session_id = after
+                condition = and_(
+                    Session.is_pinned == is_pinned,
+                    or_(
+                        Session.update_time < update_time,
+                        and_(
+                            Session.update_time == update_time,
+                            Session.session_id < session_id,
+                        ),
+                    ),
+                )
+                if is_pinned:
+                    # 置顶会话翻完后接着翻未置顶的会话
+                    condition = or_(condition, Session.is_pinned == false())
+                statement = statement.where(condition)
+            statement = statement.order_by(
+                Session.is_pinned.desc(),
+                Session.update_time.desc(),
+                Session.session_id.desc(),
+            ).limit(limit)
             result = await session.exec(statement)
             return result.all()
 
@@ -28,23 +67,18 @@ class SessionDao:
     @classmethod
     async def delete_session(cls, session_ids: List[str], user_id):
         async with async_session_getter() as session:
-            statement = delete(Session).where(
+            # 只删除属于该用户的会话及其对话轮次
+            statement = select(Session.session_id).where(
                 and_(Session.session_id.in_(session_ids), Session.user_id == user_id)
             )
-            await session.exec(statement)
-            await session.commit()
-
-    @classmethod
-    async def update_session_contexts(cls, session_id, session_context):
-        async with async_session_getter() as session:
-            session_model = await session.get(Session, session_id)
-            new_contexts = session_model.contexts.copy()
-            new_contexts.append(session_context)
-            session_model.contexts = new_contexts
-
+            owned_ids = (await session.exec(statement)).all()
+            if not owned_ids:
+                return
+            await session.exec(
+                delete(SessionTurn).where(SessionTurn.session_id.in_(owned_ids))
+            )
+            await session.exec(delete(Session).where(Session.session_id.in_(owned_ids)))
             await session.commit()
-            await session.refresh(session_model)
-        return session_model
 
     @classmethod
     async def update_session(cls, session_id, user_id, title=None, is_pinned=None):
@@ -76,6 +110,9 @@ class SessionDao:
         async with async_session_getter() as session:
             session_model = await session.get(Session, session_id)
             session_model.contexts = []
+            await session.exec(
+                delete(SessionTurn).where(SessionTurn.session_id == session_id)
+            )
 
             await session.commit()
             await session.refresh(session_model)
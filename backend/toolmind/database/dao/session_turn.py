@@ -0,0 +1,113 @@
+from typing import List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import func, select, update
+from toolmind.database.models import Session, SessionContext, SessionTurn
+from toolmind.database.session import async_session_getter
+
+# 并发追加同一会话时主键冲突的重试次数
+APPEND_TURN_MAX_RETRIES = 3
+# 迁移旧 contexts 字段时每批处理的会话数
+MIGRATE_BATCH_SIZE = 100
+
+
+def _turn_fields(session_context: dict) -> dict:
+    return {
+        key: session_context[key]
+        for key in SessionContext.model_fields
+        if key in session_context
+    }
+
+
+class SessionTurnDao:
+    @classmethod
+    async def append_turn(cls, session_id: str, session_context: dict) -> SessionTurn:
+        """追加一轮对话：序号取当前最大值 + 1，主键冲突时重新取号"""
+        for attempt in range(APPEND_TURN_MAX_RETRIES):
+            async with async_session_getter() as session:
+                # 先更新会话行：刷新修改时间（会话列表按最近活跃排序），
+                # 同时持有行锁，使同一会话的追加串行执行，主键冲突只作为兜底
+                await session.exec(
+                    update(Session)
+                    .where(Session.session_id == session_id)
+                    .values(update_time=func.now())
+                )
+                statement = select(
+                    func.coalesce(func.max(SessionTurn.seq), 0)
+                ).where(SessionTurn.session_id == session_id)
+                seq = (await session.exec(statement)).one() + 1
+
+                turn = SessionTurn(
+                    session_id=session_id, seq=seq, **_turn_fields(session_context)
+                )
+                session.add(turn)
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    if attempt == APPEND_TURN_MAX_RETRIES - 1:
+                        raise
+                    continue
+                await session.refresh(turn)
+                return turn
+
+    @classmethod
+    async def get_turns(
+        cls,
+        session_id: str,
+        before_seq: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionTurn]:
+        """按序号升序返回会话轮次；指定 limit 时取 before_seq 之前最近的 limit 轮"""
+        async with async_session_getter() as session:
+            statement = select(SessionTurn).where(SessionTurn.session_id == session_id)
+            if before_seq is not None:
+                statement = statement.where(SessionTurn.seq < before_seq)
+            statement = statement.order_by(SessionTurn.seq.desc())
+            if limit is not None:
+                statement = statement.limit(limit)
+            result = await session.exec(statement)
+            return list(reversed(result.all()))
+
+    @classmethod
+    async def migrate_session_contexts(cls) -> int:
+        """将旧 sessions.contexts 中的对话拆分写入 session_turns，返回迁移的会话数"""
+        migrated = 0
+        while True:
+            async with async_session_getter() as session:
+                statement = (
+                    select(Session)
+                    .where(func.json_length(Session.contexts) > 0)
+                    .limit(MIGRATE_BATCH_SIZE)
+                )
+                session_models = (await session.exec(statement)).all()
+                if not session_models:
+                    return migrated
+
+                for session_model in session_models:
+                    # 已有轮次说明该会话此前迁移过（或已开始追加写入），只清空旧字段
+                    existing = await session.exec(
+                        select(func.count()).where(
+                            SessionTurn.session_id == session_model.session_id
+                        )
+                    )
+                    if not existing.one():
+                        session.add_all(
+                            SessionTurn(
+                                session_id=session_model.session_id,
+                                seq=seq,
+                                **_turn_fields(session_context),
+                            )
+                            for seq, session_context in enumerate(
+                                session_model.contexts, start=1
+                            )
+                        )
+                    # 保留原修改时间，避免迁移打乱会话列表的排序
+                    await session.exec(
+                        update(Session)
+                        .where(Session.session_id == session_model.session_id)
+                        .values(contexts=[], update_time=Session.update_time)
+                    )
+                await session.commit()
+                migrated += len(session_models)
+
@@ -1,11 +1,72 @@
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from typing import List, Optional
+from uuid import uuid4
 
-from sqlmodel import and_, select
-from toolmind.database.models import UsageStats
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlmodel import and_, delete, func, insert, select
+from toolmind.database.models import UsageStats, UsageStatsDaily
 from toolmind.database.session import async_session_getter, session_getter
 
 
+def _daily_upsert_statement(records: List[dict]):
+    """将一批使用记录按 (用户, 模型) 汇总后累加到当日的预聚合行"""
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for record in records:
+        key = (record["user_id"], record.get("model") or "")
+        totals[key][0] += record.get("input_tokens") or 0
+        totals[key][1] += record.get("output_tokens") or 0
+        totals[key][2] += record.get("cached_tokens") or 0
+        totals[key][3] += 1
+
+    rows = [
+        {
+            "user_id": user_id,
+            "model": model,
+            # 与 usage_stats.create_time 的数据库时钟保持一致
+            "usage_date": func.curdate(),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "cached_tokens": cached_tokens,
+            "call_count": call_count,
+        }
+        for (user_id, model), (
+            input_tokens,
+            output_tokens,
+            cached_tokens,
+            call_count,
+        ) in totals.items()
+    ]
+    statement = mysql_insert(UsageStatsDaily).values(rows)
+    return statement.on_duplicate_key_update(
+        input_tokens=UsageStatsDaily.input_tokens + statement.inserted.input_tokens,
+        output_tokens=UsageStatsDaily.output_tokens + statement.inserted.output_tokens,
+        total_tokens=UsageStatsDaily.total_tokens + statement.inserted.total_tokens,
+        cached_tokens=UsageStatsDaily.cached_tokens + statement.inserted.cached_tokens,
+        call_count=UsageStatsDaily.call_count + statement.inserted.call_count,
+        update_time=func.now(),
+    )
+
+
+def _daily_usage_select(*group_columns):
+    """明细表按 (分组列..., 模型, 日期) 聚合的查询，命中 (user_id, create_time, model) 索引"""
+    model = func.coalesce(UsageStats.model, "").label("model")
+    usage_date = func.date(UsageStats.create_time).label("usage_date")
+    return select(
+        *group_columns,
+        model,
+        usage_date,
+        func.sum(UsageStats.input_tokens).label("input_tokens"),
+        func.sum(UsageStats.output_tokens).label("output_tokens"),
+        func.sum(UsageStats.input_tokens + UsageStats.output_tokens).label(
+            "total_tokens"
+        ),
+        func.sum(UsageStats.cached_tokens).label("cached_tokens"),
+        func.count().label("call_count"),
+    ).group_by(*group_columns, model, usage_date)
+
+
 class UsageStatsDao:
 
     @classmethod
@@ -20,10 +81,79 @@ class UsageStatsDao:
     def sync_create_usage_stats(cls, usage_stats: UsageStats):
         with session_getter() as session:
             session.add(usage_stats)
+            session.exec(_daily_upsert_statement([usage_stats.model_dump()]))
             session.commit()
             session.refresh(usage_stats)
             return usage_stats
 
+    @classmethod
+    async def batch_create_usage_stats(cls, records: List[dict]):
+        """多行 INSERT 批量写入使用记录，并在同一事务内增量更新日聚合表"""
+        if not records:
+            return
+        rows = [{"id": uuid4().hex, **record} for record in records]
+        async with async_session_getter() as session:
+            await session.exec(insert(UsageStats).values(rows))
+            await session.exec(_daily_upsert_statement(records))
+            await session.commit()
+
+    @classmethod
+    async def get_daily_usage(
+        cls,
+        user_id: str,
+        model: Optional[str] = None,
+        delta_days: int = 10000,  # 默认值可视为所有数据
+    ) -> List[UsageStatsDaily]:
+        """从日聚合表读取用量，结果行数为 天数 × 模型数"""
+        since = (datetime.now() - timedelta(days=delta_days)).date()
+        conditions = [
+            UsageStatsDaily.user_id == user_id,
+            UsageStatsDaily.usage_date >= since,
+        ]
+        if model is not None:
+            conditions.append(UsageStatsDaily.model == model)
+
+        statement = (
+            select(UsageStatsDaily)
+            .where(*conditions)
+            .order_by(UsageStatsDaily.usage_date)
+        )
+        async with async_session_getter() as session:
+            result = await session.exec(statement)
+            return result.all()
+
+    @classmethod
+    async def has_daily_usage(cls) -> bool:
+        async with async_session_getter() as session:
+            result = await session.exec(select(UsageStatsDaily.user_id).limit(1))
+            return result.first() is not None
+
+    @classmethod
+    async def rebuild_daily_usage(cls, since: Optional[date] = None):
+        """从明细表重建日聚合数据（首次上线回填或数据修复），since 为空时全量重建"""
+        source = _daily_usage_select(UsageStats.user_id)
+        clear = delete(UsageStatsDaily)
+        if since is not None:
+            source = source.where(UsageStats.create_time >= since)
+            clear = clear.where(UsageStatsDaily.usage_date >= since)
+
+        statement = mysql_insert(UsageStatsDaily).from_select(
+            [
+                "user_id",
+                "model",
+                "usage_date",
+                "input_tokens",
+                "output_tokens",
+                "total_tokens",
+                "cached_tokens",
+                "call_count",
+            ],
+            source,
+        )
+        async with async_session_getter() as session:
+            await session.exec(clear)
+            await session.exec(statement)
+            await session.commit()
 
     # 根据模型进行分类
     @classmethod
@@ -68,27 +198,6 @@ class UsageStatsDao:
             result = await session.exec(statement)
             return result.all()
 
-    @classmethod
-    async def get_agent_model_time_usage(
-        cls,
-        user_id: str,
-        model: Optional[str] = None,
-        delta_days: int = 10000,  # 默认值可视为所有数据
-    ):
-        ago_time = datetime.now() - timedelta(days=delta_days)
-
-        conditions = [UsageStats.user_id == user_id, UsageStats.create_time >= ago_time]
-
-        # 追加条件（根据 model 是否存在）
-        if model is not None:
-            conditions.append(UsageStats.model == model)
-
-        statement = select(UsageStats).where(*conditions)
-
-        async with async_session_getter() as session:
-            result = await session.exec(statement)
-            return result.all()
-
     @classmethod
     async def get_usage_models(cls, user_id):
         async with async_session_getter() as session:
@@ -1,43 +1,46 @@
 import uuid
 from typing import List
 
-from sqlmodel import func, select
+from sqlmodel import func, select, update
 from toolmind.database.models import AdminRole, DefaultRole, UserRole, UserTable
-from toolmind.database.session import session_getter
+from toolmind.database.session import async_session_getter
 
 
 class UserDao:
 
     @classmethod
-    def get_user(cls, user_id: str) -> UserTable | None:
-        with session_getter() as session:
+    async def get_user(cls, user_id: str) -> UserTable | None:
+        async with async_session_getter() as session:
             statement = select(UserTable).where(UserTable.user_id == user_id)
-            return session.exec(statement).first()
+            result = await session.exec(statement)
+            return result.first()
 
     @classmethod
-    def get_user_by_ids(cls, user_ids: List[str]) -> List[UserTable] | None:
-        with session_getter() as session:
+    async def get_user_by_ids(cls, user_ids: List[str]) -> List[UserTable] | None:
+        async with async_session_getter() as session:
             statement = select(UserTable).where(UserTable.user_id.in_(user_ids))
-            return session.exec(statement).all()
+            result = await session.exec(statement)
+            return result.all()
 
     @classmethod
-    def get_user_by_username(cls, user_name: str) -> UserTable | None:
-        with session_getter() as session:
+    async def get_user_by_username(cls, user_name: str) -> UserTable | None:
+        async with async_session_getter() as session:
             statement = select(UserTable).where(UserTable.user_name == user_name)
-            return session.exec(statement).first()
+            result = await session.exec(statement)
+            return result.first()
 
     @classmethod
-    def update_user(cls, user_id: str, user_name: str, user_password: str):
-        with session_getter() as session:
+    async def update_user(cls, user_id: str, user_name: str, user_password: str):
+        async with async_session_getter() as session:
             session.add(
                 UserTable(
                     user_id=user_id, user_name=user_name, user_password=user_password
                 )
             )
-            session.commit()
+            await session.commit()
 
     @classmethod
-    def filter_users(
+    async def filter_users(
         cls, user_ids: List[str], keyword: str = None, page: int = 0, limit: int = 0
     ) -> (List[UserTable], int):
         statement = select(UserTable)
@@ -53,33 +56,35 @@ class UserDao:
         if page and limit:
             statement = statement.offset((page - 1) * limit).limit(limit)
         statement = statement.order_by(UserTable.user_id.desc())
-        with session_getter() as session:
-            return session.exec(statement).all(), session.scalar(count_statement)
+        async with async_session_getter() as session:
+            result = await session.exec(statement)
+            return result.all(), await session.scalar(count_statement)
 
     @classmethod
-    def get_unique_user_by_name(cls, user_name: str) -> UserTable | None:
-        with session_getter() as session:
+    async def get_unique_user_by_name(cls, user_name: str) -> UserTable | None:
+        async with async_session_getter() as session:
             statement = select(UserTable).where(UserTable.user_name == user_name)
-            return session.exec(statement).first()
+            result = await session.exec(statement)
+            return result.first()
 
     @classmethod
-    def create_user(cls, user_id: str, user_name: str, user_password: str):
-        with session_getter() as session:
+    async def create_user(cls, user_id: str, user_name: str, user_password: str):
+        async with async_session_getter() as session:
             session.add(
                 UserTable(
                     user_id=user_id, user_name=user_name, user_password=user_password
                 )
             )
-            session.commit()
+            await session.commit()
 
     @classmethod
-    def add_user_and_default_role(cls, user_name: str, user_password: str):
+    async def add_user_and_default_role(cls, user_name: str, user_password: str):
         """
         新增用户，并添加默认角色
         用户的ID以此递增
         """
-        user_number = len(cls.get_user_number()) + 1
-        with session_getter() as session:
+        user_number = await cls.get_user_number() + 1
+        async with async_session_getter() as session:
             user_id = str(user_number)
             session.add(
                 UserTable(
@@ -89,14 +94,16 @@ class UserDao:
             session.add(
                 UserRole(id=uuid.uuid4().hex, user_id=user_id, role_id=DefaultRole)
             )
-            session.commit()
+            await session.commit()
 
     @classmethod
-    def add_user_and_admin_role(cls, user_id: str, user_name: str, user_password: str):
+    async def add_user_and_admin_role(
+        cls, user_id: str, user_name: str, user_password: str
+    ):
         """
         新增用户，并添加超级管理员角色
         """
-        with session_getter() as session:
+        async with async_session_getter() as session:
             session.add(
                 UserTable(
                     user_id=user_id, user_name=user_name, user_password=user_password
@@ -105,27 +112,41 @@ class UserDao:
             session.add(
                 UserRole(id=uuid.uuid4().hex, user_id=user_id, role_id=AdminRole)
             )
-            session.commit()
+            await session.commit()
 
     @classmethod
-    def get_all_users(cls, page: int = 0, limit: int = 0) -> List[UserTable]:
+    async def get_all_users(cls, page: int = 0, limit: int = 0) -> List[UserTable]:
         """
         分页获取所有用户
         """
         statement = select(UserTable)
         if page and limit:
             statement = statement.offset((page - 1) * limit).limit(limit)
-        with session_getter() as session:
-            return session.exec(statement).all()
+        async with async_session_getter() as session:
+            result = await session.exec(statement)
+            return result.all()
 
     @classmethod
-    def get_visible_users(cls):
-        with session_getter() as session:
+    async def get_visible_users(cls):
+        async with async_session_getter() as session:
             statement = select(UserTable).where(UserTable.delete == False)
-            return session.exec(statement).all()
+            result = await session.exec(statement)
+            return result.all()
 
     @classmethod
-    def get_user_number(cls) -> int:
-        with session_getter() as session:
-            statement = select(UserTable)
-            return session.exec(statement).all()
+    async def get_user_number(cls) -> int:
+        async with async_session_getter() as session:
+            statement = select(func.count(UserTable.user_id))
+            return await session.scalar(statement)
+
+    @classmethod
+    async def update_user_status(cls, user_id: str, delete: bool):
+        """启用或禁用账号（修改 delete 字段）"""
+        async with async_session_getter() as session:
+            statement = (
+                update(UserTable)
+                .where(UserTable.user_id == user_id)
+                .values(delete=delete)
+            )
+            await session.exec(statement)
+            await session.commit()
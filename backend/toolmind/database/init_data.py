@@ -1,4 +1,6 @@
 from loguru import logger
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
 from sqlmodel import SQLModel
 from toolmind.database import engine
 
@@ -9,3 +11,72 @@ async def init_database():
         logger.info("Create MySQL Table Successful")
     except Exception as err:
         logger.error(f"Create MySQL Table Error: {err}")
+
+    migrate_columns()
+    migrate_indexes()
+    await init_usage_stats_daily()
+    await init_session_turns()
+
+
+def migrate_columns():
+    """create_all 不会修改已存在的表，这里为旧表补建模型中新增的列（需带默认值或可为空）"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_spec = CreateColumn(column).compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        text(f"ALTER TABLE {table.name} ADD COLUMN {column_spec}")
+                    )
+                logger.info(f"Add column {column.name} to {table.name} Successful")
+            except Exception as err:
+                logger.error(f"Add column {column.name} Error: {err}")
+
+
+def migrate_indexes():
+    """create_all 不会修改已存在的表，这里为旧表补建模型中新增的索引"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                index.create(engine)
+                logger.info(f"Create index {index.name} on {table.name} Successful")
+            except Exception as err:
+                logger.error(f"Create index {index.name} Error: {err}")
+
+
+async def init_usage_stats_daily():
+    """日聚合表首次创建时，从历史明细回填"""
+    from toolmind.database.dao import UsageStatsDao
+
+    try:
+        if not await UsageStatsDao.has_daily_usage():
+            await UsageStatsDao.rebuild_daily_usage()
+            logger.info("Backfill usage_stats_daily Successful")
+    except Exception as err:
+        logger.error(f"Backfill usage_stats_daily Error: {err}")
+
+
+async def init_session_turns():
+    """将旧版本保存在 sessions.contexts 中的对话迁移到 session_turns"""
+    from toolmind.database.dao import SessionTurnDao
+
+    try:
+        migrated = await SessionTurnDao.migrate_session_contexts()
+        if migrated:
+            logger.info(f"Migrate {migrated} sessions to session_turns Successful")
+    except Exception as err:
+        logger.error(f"Migrate session_turns Error: {err}")
@@ -19,7 +19,9 @@ from toolmind.database.models.session import (
     SessionContext,
     SessionCreate,
 )
+from toolmind.database.models.session_turn import SessionTurn
 from toolmind.database.models.usage_stats import UsageStats, UsageStatsBase
+from toolmind.database.models.usage_stats_daily import UsageStatsDaily
 from toolmind.database.models.user import AdminUser, UserTable
 from toolmind.database.models.user_role import (
     UserRole,
@@ -45,8 +47,10 @@ __all__ = [
     "SessionBase",
     "SessionContext",
     "SessionCreate",
+    "SessionTurn",
     "UsageStats",
     "UsageStatsBase",
+    "UsageStatsDaily",
     "AdminUser",
     "UserTable",
     "UserRole",
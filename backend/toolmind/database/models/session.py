@@ -3,7 +3,7 @@ from typing import List, Optional
 from uuid import uuid4
 
 from pydantic import BaseModel
-from sqlalchemy import JSON, Boolean, Column, DateTime, text
+from sqlalchemy import JSON, Boolean, Column, DateTime, Index, text
 from sqlmodel import Field
 from toolmind.database.models.base import SQLModelSerializable
 
@@ -29,6 +29,10 @@ class SessionBase(SQLModelSerializable):
 
 class Session(SessionBase, table=True):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # 会话列表按 (置顶, 修改时间) 倒序分页
+        Index("ix_sessions_user_pinned_update", "user_id", "is_pinned", "update_time"),
+    )
 
     session_id: str = Field(
         default_factory=lambda: uuid4().hex,
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import JSON, Column, DateTime, Text, text
+from sqlmodel import Field
+from toolmind.database.models.base import SQLModelSerializable
+
+
+class SessionTurn(SQLModelSerializable, table=True):
+    """会话中的一轮对话，按 (会话, 序号) 追加写入，不再整体重写会话上下文"""
+
+    __tablename__ = "session_turns"
+
+    session_id: str = Field(primary_key=True, max_length=64, description="会话 ID")
+    # 会话内从 1 开始递增，与 session_id 组成主键，并发追加时由主键冲突保证唯一
+    seq: int = Field(primary_key=True, description="轮次序号")
+    query: str = Field("", sa_column=Column(Text), description="用户问题")
+    task: List[dict] = Field([], sa_column=Column(JSON), description="子任务执行结果")
+    task_graph: List[dict] = Field(
+        [], sa_column=Column(JSON), description="子任务依赖图"
+    )
+    answer: str = Field("", sa_column=Column(Text), description="最终回答")
+    create_time: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=False,
+            server_default=text("CURRENT_TIMESTAMP"),
+        ),
+        description="创建时间",
+    )
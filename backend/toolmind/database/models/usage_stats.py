@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, text
+from sqlalchemy import Column, DateTime, Index, text
 from sqlmodel import Field
 from toolmind.database.models.base import SQLModelSerializable
 
@@ -16,6 +16,11 @@ class UsageStatsBase(SQLModelSerializable):
     output_tokens: int = Field(
         0, description="模型生成（completion）所消耗的 token 数量"
     )
+    cached_tokens: int = Field(
+        0,
+        sa_column_kwargs={"server_default": text("0")},
+        description="输入中命中服务商提示词缓存的 token 数量",
+    )
     create_time: Optional[datetime] = Field(
         sa_column=Column(
             DateTime,
@@ -28,6 +33,10 @@ class UsageStatsBase(SQLModelSerializable):
 
 class UsageStats(UsageStatsBase, table=True):
     __tablename__ = "usage_stats"
+    __table_args__ = (
+        # 按用户 + 时间范围过滤，再按模型分组
+        Index("ix_usage_stats_user_time_model", "user_id", "create_time", "model"),
+    )
 
     id: str = Field(
         default_factory=lambda: uuid4().hex,
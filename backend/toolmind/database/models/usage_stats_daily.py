@@ -0,0 +1,37 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, text
+from sqlmodel import Field
+from toolmind.database.models.base import SQLModelSerializable
+
+
+class UsageStatsDaily(SQLModelSerializable, table=True):
+    """按 (用户, 模型, 日期) 预聚合的用量统计，写入 usage_stats 时增量更新"""
+
+    __tablename__ = "usage_stats_daily"
+
+    user_id: str = Field(primary_key=True, max_length=64, description="用户 ID")
+    # 模型名为空的记录统一归到空字符串，保证可以作为主键
+    model: str = Field(
+        default="", primary_key=True, max_length=255, description="模型名称"
+    )
+    usage_date: date = Field(primary_key=True, description="统计日期")
+    input_tokens: int = Field(0, description="当日输入 token 总数")
+    output_tokens: int = Field(0, description="当日输出 token 总数")
+    cached_tokens: int = Field(
+        0,
+        sa_column_kwargs={"server_default": text("0")},
+        description="当日命中提示词缓存的输入 token 总数",
+    )
+    total_tokens: int = Field(0, description="当日 token 总数")
+    call_count: int = Field(0, description="当日调用次数")
+    update_time: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=False,
+            server_default=text("CURRENT_TIMESTAMP"),
+            onupdate=text("CURRENT_TIMESTAMP"),
+        ),
+        description="最后更新时间",
+    )
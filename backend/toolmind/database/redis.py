@@ -99,6 +99,22 @@ class RedisClient:
         finally:
             self.close()
 
+    def delete_pattern(self, pattern, batch_size=500):
+        """按通配符删除 key，使用 SCAN 分批遍历，避免 KEYS 阻塞服务端"""
+        try:
+            deleted = 0
+            batch = []
+            for key in self.connection.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += self.connection.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.connection.delete(*batch)
+            return deleted
+        finally:
+            self.close()
+
     def get(self, key):
         try:
             value = self.connection.get(key)
@@ -52,12 +52,25 @@ def print_logo():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """应用生命周期管理：启动前初始化配置"""
+    """应用生命周期管理：启动前初始化配置，退出时释放资源"""
     await init_config()
     register_router(app)
+
+    from toolmind.api.services import session_writer, web_search_client
+    from toolmind.core.callbacks import usage_stats_writer
+    from toolmind.core.mcp import mcp_session_pool
+
+    usage_stats_writer.start()
+    session_writer.start()
     print_logo()
     yield
 
+    # 先写完会话的待写操作，再停止其他资源
+    await session_writer.stop()
+    await usage_stats_writer.stop()
+    await mcp_session_pool.close()
+    await web_search_client.close()
+
 
 def create_app():
     """创建并配置 FastAPI 实例"""
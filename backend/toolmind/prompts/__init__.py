@@ -1,19 +1,29 @@
 from toolmind.prompts.agent import (
+    EvaluateResultInputPrompt,
     EvaluateResultPrompt,
     FinalSynthesisPrompt,
     FixJsonPrompt,
+    GenerateTaskInputPrompt,
     GenerateTaskPrompt,
     GenerateTitlePrompt,
+    ReplanTaskInputPrompt,
+    ReplanTaskPrompt,
     SystemMessagePrompt,
+    ToolCallInputPrompt,
     ToolCallPrompt,
 )
 
 __all__ = [
+    "EvaluateResultInputPrompt",
     "EvaluateResultPrompt",
     "FinalSynthesisPrompt",
     "FixJsonPrompt",
+    "GenerateTaskInputPrompt",
     "GenerateTaskPrompt",
     "GenerateTitlePrompt",
+    "ReplanTaskInputPrompt",
+    "ReplanTaskPrompt",
     "SystemMessagePrompt",
+    "ToolCallInputPrompt",
     "ToolCallPrompt",
 ]
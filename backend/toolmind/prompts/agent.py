@@ -11,18 +11,18 @@ GenerateTitlePrompt = """
 
 GenerateTaskPrompt = """
 <背景>
-你是任务规划专家，需要把用户问题拆解成**严格串行**的子任务列表。每个子任务完成后结果传递给下一个，最终由最后一个子任务输出整体总结。
+你是任务规划专家，需要把用户问题拆解成子任务，子任务之间通过 input 构成**有向无环的依赖图**。互不依赖的子任务会被并行执行，最终由最后一个子任务输出整体总结。
 </背景>
 
-<串行约束>
-1. 所有子任务构成**线性链路**，不可并行、不可分叉。
-2. 第 1 步的 input 只能是 `["query"]`。
-3. 第 n 步（n > 1）的 input **只能**包含紧前一步的 step_id（如 `["step_1"]`），禁止跨步骤引用。
-</串行约束>
+<依赖约束>
+1. 不依赖任何前置步骤的子任务，input 只能是 `["query"]`；互相独立的检索、调研类子任务应各自依赖 `["query"]`，以便并行执行。
+2. 依赖前置结果的子任务，input 填写其**直接依赖**的 step_id 列表（如 `["step_1", "step_2"]`），只能引用已定义的 step_id。
+3. 禁止循环依赖，禁止引用自身。
+</依赖约束>
 
 <分解原则>
 1. 先判断复杂度：简单 1-2 步，中等 2-4 步，复杂 3-6 步。
-2. 如果拆分出 >1 个非汇总子任务，末尾**额外增加一个汇总步骤**；如果只有 1 个子任务则不需要额外汇总。
+2. 如果拆分出 >1 个非汇总子任务，末尾**额外增加一个汇总步骤**，其 input 为全部需要汇总的步骤；如果只有 1 个子任务则不需要额外汇总。
 </分解原则>
 
 <子任务字段要求>
@@ -30,8 +30,8 @@ GenerateTaskPrompt = """
 - `target`：一句话说明完成后应得到的结果。
 - `workflow`：简述执行流程，可包含工具使用及关键参数。
 - `precautions`：注意事项。
-- `input_thought`：思考本步骤依赖哪个前置步骤的输出。
-- `input`：严格按照串行约束填写。
+- `input_thought`：思考本步骤依赖哪些前置步骤的输出。
+- `input`：严格按照依赖约束填写。
 </子任务字段要求>
 
 <可用工具>
@@ -58,11 +58,69 @@ GenerateTaskPrompt = """
 ```
 </输出格式>
 
+请根据用户问题生成完整的步骤 JSON。
+"""
+
+GenerateTaskInputPrompt = """
 <用户问题>
 {query}
 </用户问题>
+"""
+
+ReplanTaskPrompt = """
+<背景>
+你是任务规划专家。上一轮按给定的子任务规划执行并汇总后，评估未通过。请根据评估意见对规划做**增量调整**：只重做有问题的子任务，其余子任务直接复用上一轮结果，避免重复的工具调用。
+</背景>
+
+<调整规则>
+1. 结果可信且仍然需要的子任务，只输出 `{{"step_id": "原 step_id", "reuse": true}}`，系统会复用其定义和结果。
+2. 需要重做的子任务，输出完整的子任务定义，并根据评估意见修改 title/target/workflow/precautions；可以沿用原 step_id。
+3. 可以新增子任务，新 step_id 不得与已有 step_id 重复；不再需要的子任务直接省略。
+4. 依赖了被重做子任务的下游步骤（包括汇总步骤）会自动重新执行，无需改写。
+5. 依赖约束与首次规划相同：input 为 `["query"]` 或直接依赖的 step_id 列表，禁止循环依赖。
+</调整规则>
+
+<可用工具>
+{tools_str}
+</可用工具>
+
+<输出格式>
+```json
+{{
+  "total_thought": "结合评估意见说明需要重做哪些步骤及原因",
+  "steps": [
+    {{"step_id": "step_1", "reuse": true}},
+    {{
+      "thought": "为什么需要重做这个步骤",
+      "step_id": "step_2",
+      "title": "子任务标题",
+      "target": "完成后的预期结果",
+      "workflow": "执行流程描述",
+      "precautions": "注意事项",
+      "input_thought": "依赖分析",
+      "input": ["query"]
+    }}
+  ]
+}}
+```
+</输出格式>
 
-请生成完整的严格串行步骤 JSON。
+请按执行顺序输出调整后的完整步骤 JSON。
+"""
+
+ReplanTaskInputPrompt = """
+<上一轮评估>
+匹配度：{eval_score}/100
+理由：{eval_reasoning}
+</上一轮评估>
+
+<上一轮子任务及结果>
+{previous_steps}
+</上一轮子任务及结果>
+
+<用户问题>
+{query}
+</用户问题>
 """
 
 FixJsonPrompt = """
@@ -79,19 +137,23 @@ ToolCallPrompt = """
 你是**子任务执行助手**，负责按照给定的子任务规划执行任务。
 
 ## 工作流程
-1. **理解子任务**：阅读 `step_info` 中的 title/target/workflow/precautions，结合 `step_context` 中前置步骤结果。
+1. **理解子任务**：阅读“当前子任务规划”中的 title/target/workflow/precautions，结合“前置步骤上下文”中的结果。
 2. **判断是否调用工具**：
    - 仅凭已有上下文可完成 → 直接用大模型完成，不调用工具
    - 涉及实时信息/文件/MCP 工具/复杂计算 → 优先调用工具
 3. **工具调用阶段**：发起 `tool_calls`，阅读 `ToolMessage` 结果，可多轮调用。此阶段不要给出最终自然语言回答。
 4. **总结阶段**：信息充分后停止工具调用，输出自然语言总结：问题、关键信息、结论、与后续步骤相关的要点。
 
-## 输入
-- 当前子任务规划：{step_info}
-- 前置步骤上下文：{step_context}
-
 ## 可用工具
 {tools_str}
+"""
+
+ToolCallInputPrompt = """
+## 当前子任务规划
+{step_info}
+
+## 前置步骤上下文
+{step_context}
 
 ## 用户原始问题
 {user_query}
@@ -137,6 +199,15 @@ EvaluateResultPrompt = """
 ## 评分标准
 - 0-100 分：≥ 80 分视为通过，< 80 分需要重跑。
 
+## 输出格式
+完成核实后，以 JSON 格式输出（不要包含 Markdown 代码块符号）：
+{
+    "score": 0,
+    "reasoning": "评判理由"
+}
+"""
+
+EvaluateResultInputPrompt = """
 <原始问题>
 {query}
 </原始问题>
@@ -144,10 +215,4 @@ EvaluateResultPrompt = """
 <待评估答案>
 {answer}
 </待评估答案>
-
-完成核实后，以 JSON 格式输出（不要包含 Markdown 代码块符号）：
-{{
-    "score": 0,
-    "reasoning": "评判理由"
-}}
 """
@@ -7,6 +7,9 @@ class Settings(BaseSettings):
     redis: dict = {}
     mysql: dict = {}
     server: dict = {}
+    web_search: dict = {}
+    tool_catalog: dict = {}
+    session_title: dict = {}
     # AuthJWT settings
     authjwt_secret_key: str = "secret"
     authjwt_token_location: list = ["cookies", "headers"]
@@ -1,6 +1,7 @@
 from toolmind.utils.constants import (
     ACCESS_TOKEN_EXPIRE_TIME,
     RSA_KEY,
+    TOOL_RESULT_CACHE_KEY,
     USER_CURRENT_SESSION,
 )
 from toolmind.utils.contexts import (
@@ -10,11 +11,17 @@ from toolmind.utils.contexts import (
 )
 from toolmind.utils.convert import convert_mcp_config, mcp_tool_to_args_schema
 from toolmind.utils.hash import md5_hash
-from toolmind.utils.json_utils import extract_and_parse_json
+from toolmind.utils.json_utils import (
+    StreamingJsonArrayParser,
+    extract_and_parse_json,
+    parse_json_with_repair,
+    repair_json,
+)
 
 __all__ = [
     "ACCESS_TOKEN_EXPIRE_TIME",
     "RSA_KEY",
+    "TOOL_RESULT_CACHE_KEY",
     "USER_CURRENT_SESSION",
     "get_user_id_context",
     "set_trace_id_context",
@@ -22,5 +29,8 @@ __all__ = [
     "convert_mcp_config",
     "mcp_tool_to_args_schema",
     "md5_hash",
+    "StreamingJsonArrayParser",
     "extract_and_parse_json",
+    "parse_json_with_repair",
+    "repair_json",
 ]
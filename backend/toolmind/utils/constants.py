@@ -2,5 +2,7 @@
 RSA_KEY = "rsa_"
 # 存储当前用户登录的 cookie, key 为用户 id
 USER_CURRENT_SESSION = "user_current_session:{}"
+# 工具调用结果缓存，key 为 用户 id + 工具所属服务 + 服务、工具名与参数的哈希
+TOOL_RESULT_CACHE_KEY = "tool_result:{}:{}:{}"
 # 配置 JWT token 的有效期
 ACCESS_TOKEN_EXPIRE_TIME = 86400
@@ -1,5 +1,6 @@
 import json
 import re
+from typing import List, Optional
 
 
 def extract_and_parse_json(text: str) -> dict:
@@ -7,3 +8,155 @@ def extract_and_parse_json(text: str) -> dict:
     json_match = re.search(r"\{.*\}", text, re.DOTALL)
     json_str = json_match.group(0) if json_match else text
     return json.loads(json_str)
+
+
+def repair_json(text: str) -> str:
+    """
+    本地修复模型输出中常见的 JSON 问题，无需再请求模型。
+
+    处理：首个对象前后的说明文字与代码块围栏、对象或数组结尾多余的逗号、
+    输出被截断导致的未闭合字符串与括号。
+    """
+    start = text.find("{")
+    if start < 0:
+        return text
+
+    out: List[str] = []
+    closers: List[str] = []
+    in_string = escape = False
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char in "}]":
+            _strip_trailing_comma(out)
+            out.append(char)
+            if closers:
+                closers.pop()
+            if not closers:
+                break
+            continue
+
+        out.append(char)
+        if char == '"':
+            in_string = True
+        elif char == "{":
+            closers.append("}")
+        elif char == "[":
+            closers.append("]")
+
+    if in_string:
+        out.append('"')
+    for closer in reversed(closers):
+        _strip_trailing_comma(out)
+        out.append(closer)
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+
+
+def parse_json_with_repair(text: str) -> dict:
+    """解析模型输出的 JSON，失败时先尝试本地修复，仍失败则抛出 ValueError"""
+    try:
+        return extract_and_parse_json(text)
+    except ValueError:
+        return json.loads(repair_json(text))
+
+
+class StreamingJsonArrayParser:
+    """
+    增量解析流式输出中顶层对象指定键（如 steps）对应的数组。
+
+    每次 feed 一段文本，返回本段中新闭合的数组元素（对象）；只跟踪括号深度与字符串状态，
+    不依赖完整 JSON，模型输出尚未结束时即可拿到已生成完的元素。
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.items: List[dict] = []
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key: Optional[str] = None
+        self._expect_array = False
+        self._array_depth: Optional[int] = None
+        self._array_closed = False
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> List[dict]:
+        self._buffer += chunk
+        buffer = self._buffer
+        completed: List[dict] = []
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buffer[self._string_start + 1 : index]
+                continue
+            if char.isspace():
+                continue
+
+            expect_array, self._expect_array = self._expect_array, False
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ":":
+                self._expect_array = (
+                    self._depth == 1
+                    and self._last_key == self.key
+                    and self._array_depth is None
+                    and not self._array_closed
+                )
+            elif char in "{[":
+                if char == "[" and expect_array:
+                    self._array_depth = self._depth + 1
+                elif char == "{" and self._depth == self._array_depth:
+                    self._item_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if (
+                    char == "}"
+                    and self._item_start >= 0
+                    and self._depth == self._array_depth
+                ):
+                    item = self._parse_item(buffer[self._item_start : index + 1])
+                    self._item_start = -1
+                    if item is not None:
+                        completed.append(item)
+                elif char == "]" and self._array_depth == self._depth + 1:
+                    self._array_depth = None
+                    self._array_closed = True
+        self._pos = len(buffer)
+        self.items.extend(completed)
+        return completed
+
+    @staticmethod
+    def _parse_item(text: str) -> Optional[dict]:
+        try:
+            item = parse_json_with_repair(text)
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
@@ -1,10 +1,11 @@
 import { request } from '../utils/request'
 
-// 获取会话列表
-export const getSessionsAPI = async () => {
+// 分页获取会话列表，cursor 为上一页返回的 next_cursor
+export const getSessionsAPI = async (params: { cursor?: string | null, limit?: number } = {}) => {
   return request({
     url: '/api/v1/sessions',
-    method: 'get'
+    method: 'get',
+    params
   })
 }
 